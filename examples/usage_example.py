@@ -6,163 +6,136 @@ Playwright MCP Server 使用示例
 """
 
 import asyncio
+from fastmcp import Client
 from mcp_playwright.server import mcp
 
-async def example_web_automation():
+# 表单示例中要填写的字段 (选择器, 文本)
+FORM_FIELDS = [
+    ("input[name='custname']", "测试用户"),
+    ("input[name='custtel']", "1234567890"),
+    ("input[name='custemail']", "test@example.com"),
+    ("textarea[name='comments']", "这是一个测试评论"),
+]
+
+
+async def call_tool(client: Client, name: str, arguments: dict = None) -> str:
+    """调用工具并返回文本结果"""
+    result = await client.call_tool(name, arguments or {})
+    return result.data
+
+
+async def read_resource(client: Client, uri: str) -> str:
+    """读取资源并返回文本内容"""
+    contents = await client.read_resource(uri)
+    return contents[0].text
+
+
+async def example_web_automation(client: Client):
     """
     网页自动化示例
 
-    演示如何使用Playwright MCP工具进行基础网页操作
+    演示如何使用Playwright MCP工具进行基础网页操作（使用共享的浏览器）
     """
     print("🚀 开始Playwright MCP示例...")
 
-    # 1. 启动浏览器
-    print("\n📱 启动浏览器...")
-    result = await mcp.call_tool("launch_browser", {
-        "browser_type": "chromium",
-        "headless": False,
-        "viewport_width": 1280,
-        "viewport_height": 720
-    })
-    print(f"   结果: {result}")
-
-    # 2. 导航到测试页面
+    # 1. 导航到测试页面
     print("\n🌐 导航到测试页面...")
-    result = await mcp.call_tool("navigate_to_url", {
+    result = await call_tool(client, "navigate_to_url", {
         "url": "https://example.com",
         "wait_until": "domcontentloaded"
     })
     print(f"   结果: {result}")
 
-    # 3. 获取页面标题
-    print("\n📄 获取页面标题...")
-    result = await mcp.call_tool("get_page_title", {})
-    print(f"   页面标题: {result}")
-
-    # 4. 获取页面URL
-    print("\n🔗 获取当前URL...")
-    result = await mcp.call_tool("get_page_url", {})
-    print(f"   当前URL: {result}")
-
-    # 5. 执行JavaScript获取页面信息
-    print("\n⚡ 执行JavaScript...")
-    result = await mcp.call_tool("execute_javascript", {
-        "code": "return {title: document.title, url: window.location.href, readyState: document.readyState}"
-    })
-    print(f"   JavaScript结果: {result}")
-
-    # 6. 截图
+    # 2-4. 并发读取页面标题、URL和JavaScript结果
+    # 注意：同一 gather 分组内只能放只读或互不冲突的操作
+    print("\n📄 获取页面标题、当前URL并执行JavaScript...")
+    title, url, js_result = await asyncio.gather(
+        call_tool(client, "get_page_title"),
+        call_tool(client, "get_page_url"),
+        call_tool(client, "execute_javascript", {
+            "code": "() => ({title: document.title, url: window.location.href, readyState: document.readyState})"
+        })
+    )
+    print(f"   页面标题: {title}")
+    print(f"   当前URL: {url}")
+    print(f"   JavaScript结果: {js_result}")
+
+    # 5. 截图
     print("\n📸 截取页面截图...")
-    result = await mcp.call_tool("take_screenshot", {
+    result = await call_tool(client, "take_screenshot", {
         "path": "example_screenshot.png",
         "full_page": True
     })
     print(f"   截图结果: {result}")
 
-    # 7. 检查浏览器状态
+    # 6. 检查浏览器状态
     print("\n🔍 检查浏览器状态...")
-    status = mcp.get_resource("browser://status")
-    print(f"   浏览器状态: {status}")
-
-    # 8. 获取当前页面信息
-    print("\n📋 获取页面信息...")
-    page_info = mcp.get_resource("page://current")
-    print(f"   页面信息: {page_info}")
+    health = await read_resource(client, "browser://health")
+    print(f"   浏览器状态: {health}")
 
-    # 9. 关闭浏览器
-    print("\n🔚 关闭浏览器...")
-    result = await mcp.call_tool("close_browser", {})
-    print(f"   关闭结果: {result}")
+    # 7. 获取当前会话信息
+    print("\n📋 获取会话信息...")
+    status = await read_resource(client, "session://status")
+    print(f"   会话信息: {status}")
 
     print("\n✅ 示例完成!")
 
-async def example_form_interaction():
+async def example_form_interaction(client: Client):
     """
     表单交互示例
 
-    演示如何与网页表单进行交互
+    演示如何与网页表单进行交互（使用共享的浏览器）
     """
     print("\n🚀 开始表单交互示例...")
 
-    # 启动浏览器
-    await mcp.call_tool("launch_browser", {
-        "browser_type": "chromium",
-        "headless": False
-    })
-
     # 导航到示例表单页面
-    await mcp.call_tool("navigate_to_url", {
+    await call_tool(client, "navigate_to_url", {
         "url": "https://httpbin.org/forms/post"
     })
 
     # 填写表单
     print("📝 填写表单字段...")
 
-    # 填写文本输入框
-    await mcp.call_tool("fill_input", {
-        "selector": "input[name='custname']",
-        "text": "测试用户"
-    })
-
-    await mcp.call_tool("fill_input", {
-        "selector": "input[name='custtel']",
-        "text": "1234567890"
-    })
-
-    await mcp.call_tool("fill_input", {
-        "selector": "input[name='custemail']",
-        "text": "test@example.com"
-    })
-
-    await mcp.call_tool("fill_input", {
-        "selector": "textarea[name='comments']",
-        "text": "这是一个测试评论"
-    })
+    # 同一页面上的填写会争用焦点和键盘输入，必须依次执行，不要放进 gather
+    for selector, text in FORM_FIELDS:
+        await call_tool(client, "fill_input", {"selector": selector, "text": text})
 
     print("📸 截图查看填写结果...")
-    await mcp.call_tool("take_screenshot", {
+    await call_tool(client, "take_screenshot", {
         "path": "form_filled.png"
     })
 
     # 提交表单
     print("📤 提交表单...")
-    await mcp.call_tool("click_element", {
+    await call_tool(client, "click_element", {
         "selector": "input[type='submit']"
     })
 
     # 等待页面加载并截图
     await asyncio.sleep(2)
-    await mcp.call_tool("take_screenshot", {
+    await call_tool(client, "take_screenshot", {
         "path": "form_submitted.png"
     })
 
-    # 关闭浏览器
-    await mcp.call_tool("close_browser", {})
     print("✅ 表单交互示例完成!")
 
-async def example_dynamic_content():
+async def example_dynamic_content(client: Client):
     """
     动态内容处理示例
 
-    演示如何处理动态加载的内容
+    演示如何处理动态加载的内容（使用共享的浏览器）
     """
     print("\n🚀 开始动态内容示例...")
 
-    # 启动浏览器
-    await mcp.call_tool("launch_browser", {
-        "browser_type": "chromium",
-        "headless": False
-    })
-
     # 导航到包含动态内容的页面
-    await mcp.call_tool("navigate_to_url", {
+    await call_tool(client, "navigate_to_url", {
         "url": "https://httpbin.org/delay/3"
     })
 
     print("⏳ 等待页面内容加载...")
 
     # 等待特定元素出现
-    result = await mcp.call_tool("wait_for_selector", {
+    result = await call_tool(client, "wait_for_selector", {
         "selector": "pre",
         "timeout": 10000,
         "state": "visible"
@@ -170,27 +143,53 @@ async def example_dynamic_content():
     print(f"   等待结果: {result}")
 
     # 获取动态加载的内容
-    content = await mcp.call_tool("get_text_content", {
+    content = await call_tool(client, "get_text_content", {
         "selector": "pre"
     })
     print(f"   页面内容: {content}")
 
-    # 关闭浏览器
-    await mcp.call_tool("close_browser", {})
     print("✅ 动态内容示例完成!")
 
+async def main():
+    """
+    在同一个事件循环中运行所有示例
+
+    浏览器会话只创建一次，由三个示例共享
+    """
+    async with Client(mcp) as client:
+        await run_examples(client)
+
+
+async def run_examples(client: Client):
+    """创建浏览器会话并依次运行示例"""
+    print("\n📱 创建浏览器会话...")
+    result = await call_tool(client, "create_browser_session", {
+        "browser_type": "chromium",
+        "headless": False,
+        "viewport_width": 1280,
+        "viewport_height": 720
+    })
+    print(f"   结果: {result}")
+
+    try:
+        # 运行基础示例
+        await example_web_automation(client)
+
+        # 运行表单交互示例
+        await example_form_interaction(client)
+
+        # 运行动态内容示例
+        await example_dynamic_content(client)
+    finally:
+        print("\n🔚 关闭浏览器会话...")
+        result = await call_tool(client, "close_browser_session")
+        print(f"   关闭结果: {result}")
+
 if __name__ == "__main__":
     print("🎯 Playwright MCP Server 使用示例")
     print("=" * 50)
 
-    # 运行基础示例
-    asyncio.run(example_web_automation())
-
-    # 运行表单交互示例
-    asyncio.run(example_form_interaction())
-
-    # 运行动态内容示例
-    asyncio.run(example_dynamic_content())
+    asyncio.run(main())
 
     print("\n🎉 所有示例运行完成!")
     print("📁 查看生成的截图文件：")
@@ -6,8 +6,10 @@
 
 import asyncio
 import logging
+import time
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Optional, Any
+from typing import AsyncIterator, Deque, Dict, Optional, Any, Tuple
 from uuid import uuid4
 import weakref
 
@@ -15,6 +17,7 @@ from playwright.async_api import (
     async_playwright,
     Browser,
     BrowserContext,
+    Locator,
     Page,
     Playwright,
     TimeoutError as PlaywrightTimeoutError,
@@ -24,6 +27,33 @@ from playwright.async_api import (
 logger = logging.getLogger(__name__)
 
 
+class PageSnapshotCache:
+    """页面快照的短时缓存 - 合并短时间内对同一页面的多次读取"""
+
+    def __init__(self, ttl: float = 0.05):
+        self.ttl = ttl
+        self._values: Dict[str, Any] = {}
+        self._expires_at = 0.0
+
+    def lookup(self, keys: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """所有字段都在有效期内时返回缓存值，否则返回 None"""
+        if time.monotonic() >= self._expires_at:
+            return None
+        if not all(key in self._values for key in keys):
+            return None
+        return {key: self._values[key] for key in keys}
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """写入新读取的字段并刷新有效期"""
+        self._values = values
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        """页面状态可能改变时使缓存失效"""
+        self._values = {}
+        self._expires_at = 0.0
+
+
 class BrowserSession:
     """浏览器会话类 - 管理单个会话的浏览器上下文"""
 
@@ -41,6 +71,16 @@ class BrowserSession:
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self._closed = False
+        # 当前登入的帳號，技能缓存按帳號区分
+        self.account: Optional[str] = None
+
+        # 快速通道解析出的DOM及推迟的浏览器导航
+        self.http_dom: Optional[Any] = None
+        self._deferred_url: Optional[str] = None
+        self._deferred_wait_until = "domcontentloaded"
+        self.snapshot_cache = PageSnapshotCache()
+        # 按选择器（或角色和名称）缓存的 Locator
+        self._locator_cache: Dict[Any, Locator] = {}
 
     async def initialize(self) -> None:
         """初始化浏览器上下文和页面"""
@@ -52,6 +92,7 @@ class BrowserSession:
                 viewport=self.viewport
             )
             self.page = await self.context.new_page()
+            self.page.on("framenavigated", self._on_frame_navigated)
             logger.info(f"会话 {self.session_id} 初始化成功")
         except Exception as e:
             logger.error(f"会话 {self.session_id} 初始化失败: {e}")
@@ -84,23 +125,67 @@ class BrowserSession:
         if not self.is_ready:
             raise RuntimeError("会话未准备就绪")
 
+        self.http_dom = None
+        self._deferred_url = None
+        self.snapshot_cache.invalidate()
+        self._locator_cache.clear()
         await self.page.goto(url, wait_until=wait_until, timeout=self.timeout)
 
+    def get_locator(self, selector: str) -> Locator:
+        """获取选择器的 Locator，与 page.click 等方法一样取第一个匹配元素"""
+        locator = self._locator_cache.get(selector)
+        if locator is None:
+            locator = self._locator_cache[selector] = self.page.locator(selector).first
+        return locator
+
+    def get_by_role(self, role: str, name: str) -> Locator:
+        """获取按角色和名称定位的 Locator"""
+        key = ("role", role, name)
+        locator = self._locator_cache.get(key)
+        if locator is None:
+            locator = self._locator_cache[key] = self.page.get_by_role(role, name=name)
+        return locator
+
+    def defer_navigation(self, url: str, dom: Any, wait_until: str = "domcontentloaded") -> None:
+        """记录通过快速通道获取的页面，推迟浏览器中的导航"""
+        self._deferred_url = url
+        self._deferred_wait_until = wait_until
+        self.http_dom = dom
+
+    @property
+    def current_url(self) -> str:
+        """当前页面URL（包括推迟的导航）"""
+        return self._deferred_url or self.page.url
+
+    async def ensure_navigated(self) -> None:
+        """如有推迟的导航，在浏览器中真正打开页面（navigate 会清除推迟状态）"""
+        if self._deferred_url:
+            await self.navigate(self._deferred_url, self._deferred_wait_until)
+
+    def _on_frame_navigated(self, frame: Any) -> None:
+        # 推迟的导航只由 navigate 清除：旧页面上的锚点跳转、pushState 等不代表已打开推迟的页面
+        if frame == self.page.main_frame:
+            self.snapshot_cache.invalidate()
+
     async def take_screenshot(
         self,
         path: Optional[str] = None,
         full_page: bool = False,
-        quality: Optional[int] = None
-    ) -> bytes:
-        """截取页面截图"""
+        quality: Optional[int] = None,
+        return_bytes: bool = True,
+        image_type: Optional[str] = None
+    ) -> Optional[bytes]:
+        """截取页面截图，return_bytes 为 False 时只写入 path 不返回数据"""
         if not self.is_ready:
             raise RuntimeError("会话未准备就绪")
 
-        return await self.page.screenshot(
+        screenshot_bytes = await self.page.screenshot(
             path=path,
+            type=image_type,
             full_page=full_page,
             quality=quality
         )
+        return screenshot_bytes if return_bytes else None
 
 
 class BrowserManager:
@@ -112,13 +197,24 @@ class BrowserManager:
         headless: bool = False,
         max_sessions: int = 10,
         default_viewport: Optional[Dict[str, int]] = None,
-        default_timeout: int = 30000
+        default_timeout: int = 30000,
+        max_idle_time: float = 30.0,
+        cleanup_interval: float = 10.0,
+        max_idle_sessions: int = 4,
+        min_idle_sessions: int = 0
     ):
         self.browser_type = browser_type
         self.headless = headless
         self.max_sessions = max_sessions
         self.default_viewport = default_viewport or {"width": 1280, "height": 720}
         self.default_timeout = default_timeout
+        # 预热池中空闲会话的最长保留时间(秒)及清理周期(秒)
+        self.max_idle_time = max_idle_time
+        self.cleanup_interval = cleanup_interval
+        # 预热池中空闲会话的最大数量
+        self.max_idle_sessions = max_idle_sessions
+        # 首次创建会话时预热的会话数，空闲清理不会销毁这部分会话
+        self.min_idle_sessions = min_idle_sessions
 
         # 内部状态
         self._playwright: Optional[Playwright] = None
@@ -128,6 +224,11 @@ class BrowserManager:
         self._lock = asyncio.Lock()
         self._initialized = False
 
+        # 预热池：(进入空闲的时间, 会话)，浏览器常驻，只池化上下文和页面
+        self._idle_sessions: Deque[Tuple[float, BrowserSession]] = deque()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._metrics: Dict[str, int] = {"created": 0, "reused": 0, "destroyed": 0}
+
     async def initialize(self) -> None:
         """初始化浏览器管理器"""
         async with self._lock:
@@ -166,15 +267,23 @@ class BrowserManager:
 
             logger.info("开始清理浏览器管理器...")
 
-            # 清理所有会话
+            if self._cleanup_task:
+                self._cleanup_task.cancel()
+                self._cleanup_task = None
+
+            # 清理所有会话（包括预热池中的空闲会话）
             cleanup_tasks = []
             for session in list(self._sessions.values()):
                 cleanup_tasks.append(session.cleanup())
+            for _, session in self._idle_sessions:
+                cleanup_tasks.append(session.cleanup())
 
             if cleanup_tasks:
                 await asyncio.gather(*cleanup_tasks, return_exceptions=True)
 
+            self._metrics["destroyed"] += len(cleanup_tasks)
             self._sessions.clear()
+            self._idle_sessions.clear()
 
             # 清理浏览器资源
             await self._cleanup_resources()
@@ -207,7 +316,8 @@ class BrowserManager:
     ) -> BrowserSession:
         """创建新的浏览器会话"""
         if not self._initialized:
-            await self.initialize()
+            # 浏览器在首次创建会话时才启动，同时预热会话池
+            await self.warm_up(count=self.min_idle_sessions)
 
         session_id = session_id or str(uuid4())
         viewport = viewport or self.default_viewport
@@ -221,14 +331,21 @@ class BrowserManager:
                 raise ValueError(f"会话 {session_id} 已存在")
 
             try:
-                session = BrowserSession(
-                    session_id=session_id,
-                    browser=self._browser,
-                    viewport=viewport,
-                    timeout=timeout
-                )
+                session = self._take_idle_session(viewport)
+                if session:
+                    session.session_id = session_id
+                    session.timeout = timeout
+                    self._metrics["reused"] += 1
+                else:
+                    session = BrowserSession(
+                        session_id=session_id,
+                        browser=self._browser,
+                        viewport=viewport,
+                        timeout=timeout
+                    )
+                    await session.initialize()
+                    self._metrics["created"] += 1
 
-                await session.initialize()
                 self._sessions[session_id] = session
                 self._session_refs[session_id] = session
 
@@ -252,9 +369,111 @@ class BrowserManager:
 
             await session.cleanup()
             del self._sessions[session_id]
+            self._metrics["destroyed"] += 1
             logger.info(f"会话已移除: {session_id}")
             return True
 
+    async def release_session(self, session_id: str) -> bool:
+        """释放会话：关闭其上下文，预热池未满时补充一个全新的上下文"""
+        async with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if not session:
+                return False
+
+            # localStorage、IndexedDB、缓存和权限等无法可靠清除，旧上下文不再复用
+            await session.cleanup()
+            self._metrics["destroyed"] += 1
+            logger.info(f"会话已移除: {session_id}")
+
+            refilled = False
+            if self._initialized and len(self._idle_sessions) < self.max_idle_sessions:
+                fresh = BrowserSession(
+                    session_id=str(uuid4()),
+                    browser=self._browser,
+                    viewport=session.viewport,
+                    timeout=self.default_timeout
+                )
+                try:
+                    await fresh.initialize()
+                except Exception as e:
+                    logger.warning(f"补充预热会话失败: {e}")
+                else:
+                    self._idle_sessions.append((time.monotonic(), fresh))
+                    self._metrics["created"] += 1
+                    refilled = True
+
+        if refilled:
+            self._start_idle_cleanup()
+        return True
+
+    async def warm_up(self, count: int = 3) -> None:
+        """预热会话池：启动浏览器并预先创建空闲的上下文和页面"""
+        await self.initialize()
+
+        async with self._lock:
+            sessions = [
+                BrowserSession(
+                    session_id=str(uuid4()),
+                    browser=self._browser,
+                    viewport=self.default_viewport,
+                    timeout=self.default_timeout
+                )
+                for _ in range(count - len(self._idle_sessions))
+            ]
+            results = await asyncio.gather(
+                *(session.initialize() for session in sessions),
+                return_exceptions=True
+            )
+
+            now = time.monotonic()
+            for session, result in zip(sessions, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"预热会话失败: {result}")
+                    continue
+                self._idle_sessions.append((now, session))
+                self._metrics["created"] += 1
+
+        logger.info(f"会话池预热完成，空闲会话数: {len(self._idle_sessions)}")
+        self._start_idle_cleanup()
+
+    def _start_idle_cleanup(self) -> None:
+        """空闲会话超过最小保留数且清理任务未运行时启动清理任务"""
+        if (
+            len(self._idle_sessions) > self.min_idle_sessions
+            and (not self._cleanup_task or self._cleanup_task.done())
+        ):
+            self._cleanup_task = asyncio.create_task(self._idle_cleanup_loop())
+
+    def _take_idle_session(self, viewport: Dict[str, int]) -> Optional[BrowserSession]:
+        """从预热池中取出视口匹配的空闲会话"""
+        for entry in self._idle_sessions:
+            session = entry[1]
+            if session.is_ready and session.viewport == viewport:
+                self._idle_sessions.remove(entry)
+                return session
+        return None
+
+    async def _idle_cleanup_loop(self) -> None:
+        """定期销毁空闲超时的预热会话，只剩最小保留数时退出"""
+        while len(self._idle_sessions) > self.min_idle_sessions:
+            await asyncio.sleep(self.cleanup_interval)
+
+            deadline = time.monotonic() - self.max_idle_time
+            async with self._lock:
+                # 池按进入空闲的时间排序，从最早的开始销毁，保留最小数量
+                expired = []
+                while (
+                    len(self._idle_sessions) > self.min_idle_sessions
+                    and self._idle_sessions[0][0] < deadline
+                ):
+                    expired.append(self._idle_sessions.popleft()[1])
+
+            for session in expired:
+                await session.cleanup()
+                self._metrics["destroyed"] += 1
+            if expired:
+                logger.info(f"已销毁 {len(expired)} 个空闲超时的预热会话")
+
     @asynccontextmanager
     async def session_context(
         self,
@@ -278,6 +497,15 @@ class BrowserManager:
         """是否已初始化"""
         return self._initialized
 
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """会话池统计"""
+        return {
+            **self._metrics,
+            "active_connections": len(self._sessions),
+            "idle": len(self._idle_sessions)
+        }
+
     async def health_check(self) -> Dict[str, Any]:
         """健康检查"""
         return {
@@ -286,5 +514,6 @@ class BrowserManager:
             "headless": self.headless,
             "session_count": self.session_count,
             "max_sessions": self.max_sessions,
-            "active_sessions": list(self._sessions.keys())
+            "active_sessions": list(self._sessions.keys()),
+            "metrics": self.metrics
         }
@@ -0,0 +1,63 @@
+"""
+静态页面快速通道 - Playwright MCP Server
+
+对不需要执行 JavaScript 的页面，直接通过 HTTP 获取并解析 HTML，跳过浏览器渲染
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Optional
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+if TYPE_CHECKING:
+    from playwright.async_api import APIRequestContext
+
+logger = logging.getLogger(__name__)
+
+# 页面依赖客户端渲染的标记
+_JS_PAGE_MARKERS = ("__NEXT_DATA__", "window.__INITIAL_STATE__", "<noscript")
+# 可见文本过少时视为需要 JavaScript 渲染
+_MIN_VISIBLE_TEXT = 200
+
+
+async def try_http_fetch(
+    request_context: "APIRequestContext",
+    url: str,
+    timeout: int = 30000
+) -> Optional[Any]:
+    """
+    通过 HTTP 获取并解析静态页面
+
+    使用浏览器上下文的请求接口（共享 Cookie），页面需要 JavaScript 时返回 None
+    """
+    if HTMLParser is None:
+        return None
+
+    try:
+        response = await request_context.get(url, timeout=timeout)
+        if not response.ok or "text/html" not in response.headers.get("content-type", ""):
+            return None
+        html = await response.text()
+    except Exception as e:
+        logger.debug(f"快速通道获取失败 {url}: {e}")
+        return None
+
+    if any(marker in html for marker in _JS_PAGE_MARKERS):
+        return None
+
+    dom = HTMLParser(html)
+    if dom.body is None or len(dom.body.text(strip=True)) < _MIN_VISIBLE_TEXT:
+        return None
+    return dom
+
+
+def select_first(dom: Any, selector: str) -> Optional[Any]:
+    """在快速通道的DOM中查找第一个匹配的元素，选择器不受支持时返回 None"""
+    try:
+        return dom.css_first(selector)
+    except Exception:
+        # XPath、text= 等 Playwright 专有选择器交由浏览器处理
+        return None
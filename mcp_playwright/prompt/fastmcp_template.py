@@ -4,6 +4,55 @@ from typing import Optional
 from fastmcp import FastMCP
 from .prompt_template_manager import PromptTemplateManager
 from .prompt_template import PromptTemplate
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _keyword_set(*keywords: str) -> frozenset:
+    """关键词统一转为小写，与 lower() 后的用户输入比较"""
+    return frozenset(k.lower() for k in keywords)
+
+
+_TEACHER_KW = _keyword_set('教師', '老師', 'teacher', '導師', '審核', '批准')
+_STUDENT_KW = _keyword_set('學生', '学号', 'student', '請假', '缺曠', '旷课', 'leave', 'truancy')
+_RESET_KW = _keyword_set('重置', 'reset', '重設')
+
+# 身份关键词，按优先级排列：教师 > 学生 > 重置
+_IDENTITY_KEYWORDS = (
+    ("teacher_management", _TEACHER_KW),
+    ("student_management", _STUDENT_KW),
+    ("reset", _RESET_KW),
+)
+
+
+def _build_identity_automaton():
+    """构建关键词自动机，一次扫描即可找出所有命中的身份"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for priority, (identity, keywords) in enumerate(_IDENTITY_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, identity))
+    automaton.make_automaton()
+    return automaton
+
+
+_IDENTITY_AUTOMATON = _build_identity_automaton()
+
+# 工作流指导的回复模板，字段来自 PromptTemplate.get_parameter_info()
+_RESPONSE_TMPL = (
+    "任務：「{task}」，系统已识别为 **{identity}** 身份。\n\n"
+    "描述: \n{description}\n\n"
+    "可用的工具: \n{tools}\n\n"
+    "工作流：\n{workflow}\n\n"
+    "執行：    \n{template_preview}"
+)
+
+
 class MCPPromptClient:
     """MCP 提示客户端"""
     
@@ -20,53 +69,39 @@ class MCPPromptClient:
         - 包含「教師」、「老師」、「teacher」等关键词 → 教师身份
         - 包含「學生」、「student」等关键词 → 学生身份
         - 包含「請假」、「缺曠」、「曠課」等关键词 → 根据上下文判断身份
+        - 包含「重置」、「reset」等关键词 → 清除已识别的身份
         - 其他情况 → 一般用户
         """
-        if self.identity is None or self.identity == "general_user":
-            self.identity = self._identify_user_identity(user_input)
-        self.identity = self._identify_user_identity(user_input)
+        identity = self._identify_user_identity(user_input)
+        if identity == "reset":
+            # 重置指令没有对应模板，清除已记住的身份
+            self.identity = None
+            return "已重置身份，请重新说明您的身份或需求。"
+        # 已识别出具体身份后，不含关键词的后续指令沿用原身份
+        if self.identity is None or identity != "general_user":
+            self.identity = identity
         template = self.template_manager.get_template(self.identity)
         if not template:
             self.identity = None
             return "未找到匹配模板，请确认身份或提供更多信息。"
-        prompt_template = template.get_parameter_info()
-        
-            
-        workflow = prompt_template["workflow"]
-        tools = prompt_template["tools"]
-        description = prompt_template["description"]
-        parameters = prompt_template["parameters"]
-        template = prompt_template["template_preview"]
-        
-        return f"""
-任務：「{user_input}」，系统已识别为 **{self.identity}** 身份。
-
-描述: 
-{description}
-
-可用的工具: 
-{tools}
-
-工作流：
-{workflow}
-
-執行：    
-{template}
-    """.strip()
+        return _RESPONSE_TMPL.format_map(
+            dict(template.get_parameter_info(), task=user_input, identity=self.identity)
+        )
 
     def _identify_user_identity(self, text: str) -> str:
         lower_text = text.lower()
-        reset_keywords = ['重置', 'reset','重設']
-        teacher_keywords = ['教師', '老師', 'teacher', '導師', '審核', '批准']
-        student_keywords = ['學生', '学号', 'student', '請假', '缺曠', '旷课', 'leave', 'truancy']
-        if any(k in lower_text for k in teacher_keywords):
-            return "teacher_management"
-        elif any(k in lower_text for k in student_keywords):
-            return "student_management"
-        elif any(k in lower_text for k in reset_keywords):
-            return "reset"
-        else:
-            return "general_user"
+        if _IDENTITY_AUTOMATON is not None:
+            best = None
+            for _, match in _IDENTITY_AUTOMATON.iter(lower_text):
+                if best is None or match < best:
+                    best = match
+            return best[1] if best else "general_user"
+
+        # 未安装 pyahocorasick 时逐类扫描
+        for identity, keywords in _IDENTITY_KEYWORDS:
+            if any(k in lower_text for k in keywords):
+                return identity
+        return "general_user"
 
 
 
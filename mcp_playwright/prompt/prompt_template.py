@@ -3,10 +3,23 @@
 from typing import Dict, List, Any, Optional
 import json
 import inspect
+import re
+
+# 匹配 {{parameter}} 格式的占位符
+_PARAM_RE = re.compile(r'\{\{(\w+)\}\}')
+
+
+def _compile_template(template: str) -> str:
+    """将 {{parameter}} 占位符转换为 str.format_map 可用的格式，并转义其余花括号"""
+    pieces = _PARAM_RE.split(template)
+    pieces[::2] = [p.replace("{", "{{").replace("}", "}}") for p in pieces[::2]]
+    pieces[1::2] = [f"{{{name}}}" for name in pieces[1::2]]
+    return "".join(pieces)
+
 
 class PromptTemplate:
     """基础提示模板类"""
-    
+
     def __init__(self, name: str, description: str, template: str, tools: list , workflow: dict):
         self.name = name
         self.description = description
@@ -14,28 +27,28 @@ class PromptTemplate:
         self.workflow = workflow
         self.template = template
         self.parameters = self._extract_parameters()
-    
+        self._compiled = _compile_template(template)
+        # 模板构建后不再修改，参数信息在此一次性生成
+        self._info: Dict[str, str] = {
+            "name": self.name,
+            "description": self.description,
+            "parameters": "\n".join(self.parameters),
+            "tools": "\n".join(self.tools),
+            "workflow": "\n".join(f"{a}:  調用工具：{b}" for a, b in self.workflow.items()),
+            "template_preview": self.template[:100] + "..." if len(self.template) > 100 else self.template
+        }
+
     def _extract_parameters(self) -> List[str]:
         """从模板中提取参数占位符"""
-        import re
-        # 查找 {{parameter}} 格式的占位符
-        pattern = r'\{\{(\w+)\}\}'
-        return re.findall(pattern, self.template)
-    
+        return _PARAM_RE.findall(self.template)
+
     def render(self, **kwargs) -> str:
         """渲染模板"""
         try:
-            return self.template.format(**kwargs)
+            return self._compiled.format_map(kwargs)
         except KeyError as e:
             raise ValueError(f"缺少必需的参数: {e}")
-    
+
     def get_parameter_info(self) -> Dict[str, str]:
         """获取参数信息"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": "\n".join(self.parameters),
-            "tools": "\n".join(self.tools),
-            "workflow": "\n".join(f"{a}:  調用工具：{b}" for a, b in self.workflow.items()),
-            "template_preview": self.template[:100] + "..." if len(self.template) > 100 else self.template
-        }
\ No newline at end of file
+        return self._info
\ No newline at end of file
@@ -4,15 +4,30 @@ Playwright MCP Server - 基于FastMCP框架的重新实现
 提供专业级的浏览器自动化MCP服务，具备完善的生命周期管理和错误处理
 """
 
+import asyncio
 import json
 import logging
+import os
+import sys
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, Annotated, Union, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Annotated, Union, Optional, Tuple
 
 from fastmcp import FastMCP
 
-from .core.browser_manager import BrowserManager
-from .tools.browser_tools import BrowserTools
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .tools.registry import TOOL_SPECS, tools_help
+
+# Playwright 相关模块较重，延迟到 server_lifespan 中导入
+if TYPE_CHECKING:
+    from .core.browser_manager import BrowserManager
+    from .prompt.fastmcp_template import MCPPromptClient
+    from .skills.skill_cache import SkillCache
+    from .tools.browser_tools import BrowserTools
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -21,17 +36,22 @@ logger = logging.getLogger(__name__)
 
 
 # 全局变量
-browser_manager: BrowserManager = None
-browser_tools: BrowserTools = None
+browser_manager: Optional["BrowserManager"] = None
+browser_tools: Optional["BrowserTools"] = None
+skill_cache: Optional["SkillCache"] = None
 
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     """服务器生命周期管理"""
-    global browser_manager, browser_tools
+    global browser_manager, browser_tools, skill_cache
 
     logger.info("🚀 启动 Playwright MCP 服务器...")
 
+    from .core.browser_manager import BrowserManager
+    from .skills.skill_cache import SkillCache
+    from .tools.browser_tools import BrowserTools
+
     try:
         # 初始化浏览器管理器
         browser_manager = BrowserManager(
@@ -39,11 +59,20 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
             headless=False,
             max_sessions=10,
             default_viewport={"width": 1280, "height": 720},
-            default_timeout=30000
+            default_timeout=30000,
+            # 浏览器在首次创建会话时按请求的无头模式启动，并预热会话池
+            min_idle_sessions=3
         )
 
-        # 初始化浏览器工具
-        browser_tools = BrowserTools(browser_manager)
+        # 技能缓存会把查询请求写入磁盘，设置 MCP_SKILL_CACHE 时才启用
+        if os.getenv("MCP_SKILL_CACHE"):
+            skill_cache = SkillCache()
+        # HTTP 快速通道会对目标URL多发一次请求，设置 MCP_HTTP_FAST_PATH 时才启用
+        browser_tools = BrowserTools(
+            browser_manager,
+            skill_cache=skill_cache,
+            http_fast_path=bool(os.getenv("MCP_HTTP_FAST_PATH"))
+        )
 
         logger.info("✅ Playwright MCP 服务器启动完成")
 
@@ -58,6 +87,8 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
         logger.info("🔄 清理 Playwright MCP 服务器资源...")
         if browser_manager:
             await browser_manager.cleanup()
+        if skill_cache:
+            skill_cache.close()
         logger.info("✅ Playwright MCP 服务器资源清理完成")
 
 # 创建FastMCP服务器
@@ -68,7 +99,6 @@ mcp = FastMCP("Playwright MCP Server", lifespan = server_lifespan )
 
 # ==================== 浏览器控制工具 ====================
 
-@mcp.tool()
 async def create_browser_session(
     browser_type: str = "chromium",
     headless: bool = False,
@@ -94,13 +124,11 @@ async def create_browser_session(
     )
 
 
-@mcp.tool()
 async def close_browser_session() -> str:
     """关闭当前浏览器会话"""
     return await browser_tools.close_session()
 
 
-@mcp.tool()
 async def navigate_to_url(
     url: str,
     wait_until: str = "domcontentloaded"
@@ -116,7 +144,6 @@ async def navigate_to_url(
 
 # ==================== 页面交互工具 ====================
 
-@mcp.tool()
 async def click_element(
     selector: str,
     timeout: int = 30000,
@@ -133,7 +160,6 @@ async def click_element(
     return await browser_tools.click_element(selector, timeout, force)
 
 
-@mcp.tool()
 async def fill_input(
     selector: str,
     text: str,
@@ -150,7 +176,6 @@ async def fill_input(
     return await browser_tools.fill_input(selector, text, timeout)
 
 
-@mcp.tool()
 async def wait_for_selector(
     selector: str,
     timeout: int = 30000,
@@ -169,7 +194,6 @@ async def wait_for_selector(
 
 # ==================== 数据提取工具 ====================
 
-@mcp.tool()
 async def get_text_content(
     selector: str,
     timeout: int = 30000
@@ -184,7 +208,6 @@ async def get_text_content(
     return await browser_tools.get_text_content(selector, timeout)
 
 
-@mcp.tool()
 async def get_element_attribute(
     selector: str,
     attribute: str,
@@ -201,13 +224,11 @@ async def get_element_attribute(
     return await browser_tools.get_element_attribute(selector, attribute, timeout)
 
 
-@mcp.tool()
 async def get_page_title() -> str:
     """获取页面标题"""
     return await browser_tools.get_page_title()
 
 
-@mcp.tool()
 async def get_page_url() -> str:
     """获取当前页面URL"""
     return await browser_tools.get_page_url()
@@ -215,11 +236,10 @@ async def get_page_url() -> str:
 
 # ==================== 高级功能工具 ====================
 
-@mcp.tool()
 async def take_screenshot(
     path: Optional[str] = None,
     full_page: bool = False,
-    quality: int = 80
+    quality: Optional[int] = 80
 ) -> str:
     """
     截取页面截图
@@ -227,12 +247,11 @@ async def take_screenshot(
     Args:
         path: 保存路径(可选)
         full_page: 是否截取整页
-        quality: 图片质量(1-100)
+        quality: JPEG图片质量(1-100)，未提供路径时为空则返回PNG
     """
     return await browser_tools.take_screenshot(path, full_page, quality)
 
 
-@mcp.tool()
 async def execute_javascript(code: str) -> str:
     """
     执行JavaScript代码
@@ -242,7 +261,6 @@ async def execute_javascript(code: str) -> str:
     """
     return await browser_tools.execute_javascript(code)
 
-@mcp.tool()
 async def save_page_to_file(filename:str) -> str:
     """
     将当前页面保存为HTML文件
@@ -251,14 +269,12 @@ async def save_page_to_file(filename:str) -> str:
     """
     return await browser_tools.save_page_to_file(filename)
 
-@mcp.tool()
 async def snapshot() -> str:
     """
     回傳当前页面的快照
     """
     return await browser_tools.snapshot()
 
-@mcp.tool()
 async def login_teacher_account(account: str, password: str) -> str:
     """
     登入教師帳號
@@ -268,7 +284,6 @@ async def login_teacher_account(account: str, password: str) -> str:
     """
     return await browser_tools.login_teacher_account(account, password)
 
-@mcp.tool()
 async def login_student_account(account: str, password: str) -> str:
     """
     登入學生帳號
@@ -278,7 +293,6 @@ async def login_student_account(account: str, password: str) -> str:
     """
     return await browser_tools.login_student_account(account, password)   
 
-@mcp.tool()
 async def Student_Leaved_List() -> str:
     """
     查詢學生已請假名單
@@ -286,7 +300,6 @@ async def Student_Leaved_List() -> str:
     return await browser_tools.get_student_leave_list()
 
 
-@mcp.tool()
 async def Accept_Student_Leave_Request(info_name:str, info_time:str) -> str:
     """
     執行同意學生請假相關流程
@@ -296,14 +309,12 @@ async def Accept_Student_Leave_Request(info_name:str, info_time:str) -> str:
     """
     return await browser_tools.accept_student_leave(info_name, info_time)
 
-@mcp.tool()
 async def Class_log_not_filled_inquire() -> str:
     """
     查詢教室日誌未填及未輸入缺曠清單
     """
     return await browser_tools.Classroom_log_not_filled_inquiry()
 
-@mcp.tool()
 async def auto_fill_classroom_log(month:str, day:str) -> str:
     """
     自動填寫教室日誌
@@ -313,7 +324,6 @@ async def auto_fill_classroom_log(month:str, day:str) -> str:
     """
     return await browser_tools.auto_fill_classroom_log(month, day)
 
-@mcp.tool()
 async def student_Truancy_Record() -> str:
     """
     查詢學生曠課紀錄
@@ -322,7 +332,6 @@ async def student_Truancy_Record() -> str:
     return await browser_tools.Student_Truancy_Record_inquiry()
 
 
-@mcp.tool()
 async def fill_Student_Leave_application(month: str, date: str, 
                                          start_sec: int, 
                                          end_sec: int) -> str:
@@ -348,6 +357,52 @@ async def fill_Student_Leave_application(month: str, date: str,
     return await browser_tools.fill_Student_Leave_application(month, date, format_number(start_sec),
                                                               format_number(end_sec))
 
+
+# ==================== 工具注册 ====================
+
+_TOOL_FUNCS = {
+    fn.__name__: fn
+    for fn in (
+        create_browser_session,
+        close_browser_session,
+        navigate_to_url,
+        click_element,
+        fill_input,
+        wait_for_selector,
+        get_text_content,
+        get_element_attribute,
+        get_page_title,
+        get_page_url,
+        take_screenshot,
+        execute_javascript,
+        save_page_to_file,
+        snapshot,
+        login_teacher_account,
+        login_student_account,
+        Student_Leaved_List,
+        Accept_Student_Leave_Request,
+        Class_log_not_filled_inquire,
+        auto_fill_classroom_log,
+        student_Truancy_Record,
+        fill_Student_Leave_application,
+    )
+}
+
+def _register_tools() -> None:
+    """以注册表为准注册工具，注册表与实现不一致时在导入时即报错"""
+    registered = {name for name, _, _ in TOOL_SPECS}
+    if set(_TOOL_FUNCS) != registered:
+        raise RuntimeError(
+            f"工具注册表与实现不一致: 未注册 {sorted(set(_TOOL_FUNCS) - registered)}，"
+            f"缺少实现 {sorted(registered - set(_TOOL_FUNCS))}"
+        )
+
+    for name, _, _ in TOOL_SPECS:
+        mcp.tool()(_TOOL_FUNCS[name])
+
+
+_register_tools()
+
 # student_name = Annotated[str, "學生姓名" ]
 # student_all = Annotated[dict[str,str], '{"class":班級, "number":學號, "name":姓名, "kind":假別, "time":建檔時間,  "teacher":導師審核結果}']
 # async def outoforder_Accept_Student_Leave(name :Union[student_name, student_all] ) -> str:
@@ -358,83 +413,85 @@ async def fill_Student_Leave_application(month: str, date: str,
 
 # ==================== 资源接口 ====================
 
+# 资源默认输出紧凑 JSON，调试时设置 MCP_PRETTY_JSON 输出缩进格式
+_PRETTY = bool(os.getenv("MCP_PRETTY_JSON"))
+
+
+def _dumps(data: Any) -> str:
+    """序列化资源数据，优先使用 orjson"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if _PRETTY:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option).decode()
+    if _PRETTY:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# 工具帮助是静态的，导入时序列化一次
+_TOOLS_HELP_JSON = _dumps(tools_help())
+# 健康状态只在统计值变化时重新序列化: (状态键, JSON)
+_health_cache: Tuple[Optional[tuple], str] = (None, "")
+
+
 @mcp.resource("session://status")
 def get_session_status() -> str:
     """获取当前会话状态"""
     if not browser_tools:
-        return json.dumps({
+        return _dumps({
             "error": "服务器未初始化",
             "status": "not_initialized"
-        }, ensure_ascii=False, indent=2)
+        })
 
     status = browser_tools.get_session_status()
-    return json.dumps(status, ensure_ascii=False, indent=2)
+    return _dumps(status)
 
 
 @mcp.resource("browser://health")
 def get_browser_health() -> str:
     """获取浏览器管理器健康状态"""
+    global _health_cache
+
     if not browser_manager:
-        return json.dumps({
+        return _dumps({
             "error": "浏览器管理器未初始化",
             "status": "not_initialized"
-        }, ensure_ascii=False, indent=2)
+        })
 
     # 由于FastMCP不支持异步资源，我们返回基本状态
-    return json.dumps({
-        "initialized": browser_manager.is_initialized,
-        "session_count": browser_manager.session_count,
-        "max_sessions": browser_manager.max_sessions,
-        "status": "healthy" if browser_manager.is_initialized else "not_ready"
-    }, ensure_ascii=False, indent=2)
+    metrics = browser_manager.metrics
+    key = (
+        browser_manager.is_initialized,
+        browser_manager.session_count,
+        browser_manager.max_sessions,
+        tuple(metrics.items())
+    )
+    if key != _health_cache[0]:
+        _health_cache = (key, _dumps({
+            "initialized": browser_manager.is_initialized,
+            "session_count": browser_manager.session_count,
+            "max_sessions": browser_manager.max_sessions,
+            "metrics": metrics,
+            "status": "healthy" if browser_manager.is_initialized else "not_ready"
+        }))
+    return _health_cache[1]
 
 
 @mcp.resource("help://tools")
 def get_tools_help() -> str:
     """获取工具使用帮助"""
-    help_info = {
-        "浏览器控制": {
-            "create_browser_session": "创建新的浏览器会话",
-            "close_browser_session": "关闭当前浏览器会话",
-            "navigate_to_url": "导航到指定URL"
-        },
-        "页面交互": {
-            "click_element": "点击页面元素",
-            "fill_input": "填写输入框",
-            "wait_for_selector": "等待元素出现"
-        },
-        "数据提取": {
-            "get_text_content": "获取元素文本内容",
-            "get_element_attribute": "获取元素属性值",
-            "get_page_title": "获取页面标题",
-            "get_page_url": "获取当前页面URL"
-        },
-        "高级功能": {
-            "take_screenshot": "截取页面截图",
-            "execute_javascript": "执行JavaScript代码"
-        },
-        "教師管理": {
-            "login_teacher_account": "登入教師帳號",
-            "Student_Leaved_List": "查詢學生已請假名單",
-            "Accept_Student_Leave": "同意學生請假",
-            "Class_log_not_filled_inquire": "查詢教室日誌未填及未輸入缺曠清單",
-            "auto_fill_classroom_log": "自動填寫教室日誌",
-            "close_browser_session": "完成後关闭当前浏览器会话"
-        },
-        "學生請假": {
-            "login_student_account": "登入學生帳號",
-            "student_Truancy_Record": "查詢學生曠課紀錄",
-            "fill_Student_Leave_application": "填寫學生請假申請單",
-            "close_browser_session": "完成後关闭当前浏览器会话"
-        }
-    }
-
-    return json.dumps(help_info, ensure_ascii=False, indent=2)
+    return _TOOLS_HELP_JSON
 
 
 # ==================== 提示模板 ====================
-from .prompt.fastmcp_template import MCPPromptClient
-my_prompt_client = MCPPromptClient()
+@lru_cache(maxsize=None)
+def _get_prompt_client() -> "MCPPromptClient":
+    """首次使用提示时才构建提示客户端"""
+    from .prompt.fastmcp_template import MCPPromptClient
+    return MCPPromptClient()
+
+
 @mcp.prompt()
 def default_prompt(user_input: str) -> str:
     """
@@ -442,7 +499,7 @@ def default_prompt(user_input: str) -> str:
     Args:
         user_input: 用户输入的文本
     """
-    return my_prompt_client.identity_based_workflow(user_input)
+    return _get_prompt_client().identity_based_workflow(user_input)
 
 # def web_automation_prompt(task: str, url: str = "https://example.com") -> str:
 #     """
@@ -532,6 +589,20 @@ def default_prompt(user_input: str) -> str:
 # """
 
 
+def main() -> None:
+    """命令行入口：运行服务器"""
+    # 使用 libuv 事件循环降低每次 await 的开销（Windows 不支持 uvloop）
+    # 只在运行服务器时设置，导入本模块不会改变宿主程序的事件循环策略
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+
+    mcp.run()
+
+
 if __name__ == "__main__":
     # 运行服务器
-    mcp.run()
+    main()
@@ -0,0 +1 @@
+# 技能缓存模块
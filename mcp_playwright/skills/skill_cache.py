@@ -0,0 +1,184 @@
+"""
+技能缓存 - Playwright MCP Server
+
+将重复执行的只读查询流程记录为"技能"（最终页面的 HTTP 请求），
+再次执行时通过浏览器上下文的请求接口直接回放，跳过页面导航和渲染
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from playwright.async_api import APIRequestContext, Page, Request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".mcp_playwright" / "skills.sqlite"
+
+# 允许持久化的请求头，Cookie、Authorization 等凭据由浏览器上下文在回放时补全
+_PERSISTED_HEADERS = frozenset((
+    "accept",
+    "accept-language",
+    "referer",
+    "user-agent",
+))
+_CHARSET_RE = re.compile(rb'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+@dataclass
+class Skill:
+    """可回放的技能记录"""
+
+    domain: str
+    action_sig: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    body: Optional[str]
+    status: int
+
+    async def execute(self, request_context: "APIRequestContext") -> Tuple[int, str]:
+        """回放请求，返回 (状态码, 解码后的HTML)"""
+        response = await request_context.fetch(
+            self.url,
+            method=self.method,
+            headers=self.headers,
+            data=self.body
+        )
+        body = await response.body()
+
+        # 优先使用响应头中的编码，其次是页面 <meta> 中声明的编码
+        content_type = response.headers.get("content-type", "").encode()
+        match = _CHARSET_RE.search(content_type) or _CHARSET_RE.search(body[:2048])
+        charset = match.group(1).decode() if match else "utf-8"
+        try:
+            return response.status, body.decode(charset, errors="replace")
+        except LookupError:
+            return response.status, body.decode("utf-8", errors="replace")
+
+
+class NavigationRecorder:
+    """记录页面主框架的导航请求，作为技能的来源"""
+
+    def __init__(self, page: "Page"):
+        self.page = page
+        self.last_request: Optional["Request"] = None
+
+    def _on_request(self, request: "Request") -> None:
+        if request.is_navigation_request() and request.frame == self.page.main_frame:
+            self.last_request = request
+
+    def __enter__(self) -> "NavigationRecorder":
+        self.page.on("request", self._on_request)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.page.remove_listener("request", self._on_request)
+
+
+class SkillCache:
+    """按 (域名, 动作签名) 持久化的技能缓存"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS skills ("
+            " domain TEXT NOT NULL,"
+            " action_sig TEXT NOT NULL,"
+            " method TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " body TEXT,"
+            " status INTEGER NOT NULL,"
+            " PRIMARY KEY (domain, action_sig))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def signature(tool_name: str, selector: str, url: str, account: str) -> str:
+        """计算动作签名：工具名 + 选择器 + 入口URL + 登入帳號"""
+        return hashlib.sha1(f"{tool_name}|{selector}|{url}|{account}".encode()).hexdigest()
+
+    def lookup(self, domain: str, action_sig: str) -> Optional[Skill]:
+        """查找技能"""
+        row = self._conn.execute(
+            "SELECT method, url, headers, body, status FROM skills"
+            " WHERE domain = ? AND action_sig = ?",
+            (domain, action_sig)
+        ).fetchone()
+        if not row:
+            return None
+
+        method, url, headers, body, status = row
+        return Skill(domain, action_sig, method, url, json.loads(headers), body, status)
+
+    def store(self, skill: Skill) -> None:
+        """保存技能"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO skills VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                skill.domain,
+                skill.action_sig,
+                skill.method,
+                skill.url,
+                json.dumps(skill.headers, ensure_ascii=False),
+                skill.body,
+                skill.status
+            )
+        )
+        self._conn.commit()
+        logger.info(f"已记录技能 {skill.domain} {skill.method} {skill.url}")
+
+    def invalidate(self, domain: str, action_sig: str) -> None:
+        """使技能失效"""
+        self._conn.execute(
+            "DELETE FROM skills WHERE domain = ? AND action_sig = ?",
+            (domain, action_sig)
+        )
+        self._conn.commit()
+        logger.info(f"技能已失效: {domain} {action_sig}")
+
+    async def record(
+        self,
+        domain: str,
+        action_sig: str,
+        request: "Request"
+    ) -> Optional[Skill]:
+        """根据导航请求生成并保存技能，只记录 GET 请求"""
+        # 表单提交（POST）的参数和页面状态在回放时会过期，不作为技能
+        if request.method != "GET":
+            logger.debug(f"跳过非 GET 请求的技能记录: {request.method} {request.url}")
+            return None
+
+        response = await request.response()
+        if not response:
+            return None
+
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name in _PERSISTED_HEADERS
+        }
+        skill = Skill(
+            domain=domain,
+            action_sig=action_sig,
+            method=request.method,
+            url=request.url,
+            headers=headers,
+            body=request.post_data,
+            status=response.status
+        )
+        self.store(skill)
+        return skill
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
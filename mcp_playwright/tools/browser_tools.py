@@ -4,32 +4,147 @@
 提供标准的浏览器自动化操作工具
 """
 
+import asyncio
 import base64
+import itertools
 import json
 import logging
+import operator
+import os
 import quopri
 import re
-from typing import Optional, Any, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
 from playwright.async_api import expect, Dialog
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError 
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..core.browser_manager import BrowserManager, BrowserSession
+from ..core.fast_http import select_first, try_http_fetch
+from ..skills.skill_cache import NavigationRecorder, SkillCache
 
 logger = logging.getLogger(__name__)
 
+# 校務系統頁面
+_TEACHER_LOGIN_URL = "https://fac.tumt.edu.tw/personal/personal/"
+_TEACHER_INDEX_URL = "https://fac.tumt.edu.tw/personal/personal/Index.aspx"
+_INSTRUCTOR_INDEX_URL = "https://fac.tumt.edu.tw/personal/Instructor/index.aspx"
+_LEAVE_REVIEW_URL = "https://fac.tumt.edu.tw/personal/Teacher/qry/AbsPer.aspx"
+_STUDENT_LOGIN_URL = "https://std.tumt.edu.tw/personal/pstudent/login.aspx"
+_STUDENT_INDEX_URL = "https://std.tumt.edu.tw/personal/pstudent/Index.aspx?test2=Y"
+
+# 登入表單
+_ACCOUNT_INPUT = 'input[name="sID"]'
+_TEACHER_PASSWORD_INPUT = "#sPassword"
+_STUDENT_PASSWORD_INPUT = 'input[name="sStd_Pw"]'
+_LOGIN_BUTTON_NAME = "登入本校個人網頁"
+
+# 請假列表中一行的欄位，依序組成該行的可訪問名稱
+_LEAVE_ROW_FIELDS = operator.itemgetter("class", "number", "name", "kind", "time", "teacher")
+
+# aria 快照中的列表項行
+_SNAP_RE = re.compile(r'^(?P<ind>[ ]*)- (?P<body>.*)$', re.MULTILINE)
+
+# page_snapshot 可读取的页面字段及对应的 JavaScript 表达式
+_SNAPSHOT_FIELDS = {
+    "title": "document.title",
+    "url": "location.href",
+    "ready": "document.readyState",
+}
+
+
+@lru_cache(maxsize=None)
+def _snapshot_expression(keys: Tuple[str, ...]) -> str:
+    """生成一次性读取指定字段的 JavaScript 表达式"""
+    fields = ", ".join(f"{key}: {_SNAPSHOT_FIELDS[key]}" for key in keys)
+    return f"() => ({{{fields}}})"
+
+
+# 表格HTML中的控制字符、零寬字符及連續空白（含全形空白）統一壓縮為一個空格
+_CLEAN_TEXT_JS = r"/[\s\x00-\x1f\x7f-\x9f\u200b-\u200f]+/g"
+
+# 复制表格并移除所有元素的屬性，只保留结构和文本
+_STRIP_ATTRS_JS = """
+(selector) => {
+    const element = document.querySelector(selector);
+    if (!element) return "元素未找到";
+
+    // 複製元素以避免修改原內容
+    const clone = element.cloneNode(true);
+    const walker = document.createTreeWalker(clone, NodeFilter.SHOW_ELEMENT);
+    let node = clone;
+    while (node) {
+        for (const attr of node.getAttributeNames()) {
+            node.removeAttribute(attr);
+        }
+        node = walker.nextNode();
+    }
+    return clone.outerHTML.replace(%s, " ").trim();
+}
+""" % _CLEAN_TEXT_JS
+
+# 教室日誌列表中每行的第三欄（勾选框所在的儲存格）
+_LOG_CHECK_CELLS = "tr > td:nth-child(3)"
+
+# 返回列表中第一个未勾选且未处理过的儲存格（done 为已处理的行号），没有时返回 null
+# 只看勾选框所在儲存格为第三欄的行，排除 #AutoNumber1 编辑表单
+_NEXT_UNCHECKED_LOG_CELL_JS = """
+(done) => {
+    for (const box of document.querySelectorAll("input[type=checkbox]")) {
+        const cell = box.closest("td");
+        if (!cell || cell.cellIndex !== 2 || box.closest("#AutoNumber1")) continue;
+        if (!box.checked && !done.includes(cell.parentElement.rowIndex)) return cell;
+    }
+    return null;
+}
+"""
+
+# 在浏览器中解析回放得到的HTML，取出表格并移除所有屬性
+_REPLAY_TABLE_JS = """
+([html, selector]) => {
+    const doc = new DOMParser().parseFromString(html, "text/html");
+    const element = doc.querySelector(selector);
+    if (!element) return null;
+
+    for (const node of [element, ...element.querySelectorAll("*")]) {
+        for (const attr of node.getAttributeNames()) {
+            node.removeAttribute(attr);
+        }
+    }
+    return element.outerHTML.replace(%s, " ").trim();
+}
+""" % _CLEAN_TEXT_JS
+
 
 class BrowserTools:
     """浏览器工具集合类"""
 
-    def __init__(self, browser_manager: BrowserManager):
+    # 每次工具调用都会访问这些属性，使用 __slots__ 避免实例字典查找
+    __slots__ = ("browser_manager", "_current_session", "_skill_cache", "_http_fast_path")
+
+    def __init__(
+        self,
+        browser_manager: BrowserManager,
+        skill_cache: Optional[SkillCache] = None,
+        http_fast_path: bool = False
+    ):
         self.browser_manager = browser_manager
         self._current_session: Optional[BrowserSession] = None
+        self._skill_cache = skill_cache
+        self._http_fast_path = http_fast_path
 
     def _get_current_session(self) -> BrowserSession:
         """获取当前会话，如果不存在则抛出异常"""
-        if not self._current_session or not self._current_session.is_ready:
+        session = self._current_session
+        if session is None or not session.is_ready:
             raise RuntimeError("浏览器会话未初始化，请先创建会话")
-        return self._current_session
+        return session
 
     async def create_session(
         self,
@@ -50,20 +165,26 @@ class BrowserTools:
             timeout: 默认超时时间(毫秒)
         """
         try:
-            # 如果存在当前会话，先清理
+            # 如果存在当前会话，先释放
             if self._current_session:
-                await self.browser_manager.remove_session(self._current_session.session_id)
+                await self.browser_manager.release_session(self._current_session.session_id)
+
+            # 无头模式只能在浏览器启动前设置，浏览器已运行时沿用原设置
+            manager = self.browser_manager
+            if not manager.is_initialized:
+                manager.headless = headless
+            elif manager.headless != headless:
+                logger.warning(f"浏览器已以无头模式 {manager.headless} 启动，忽略 headless={headless}")
 
             # 创建新会话
-            self.browser_manager.headless = headless
-            session = await self.browser_manager.create_session(
+            session = await manager.create_session(
                 viewport={"width": viewport_width, "height": viewport_height},
                 timeout=timeout
             )
 
             self._current_session = session
 
-            return f"成功创建浏览器会话 {session.session_id} ({browser_type}, 无头模式: {headless})"
+            return f"成功创建浏览器会话 {session.session_id} ({browser_type}, 无头模式: {manager.headless})"
 
         except Exception as e:
             logger.error(f"创建浏览器会话失败: {e}")
@@ -76,7 +197,7 @@ class BrowserTools:
                 return "没有活动的浏览器会话"
 
             session_id = self._current_session.session_id
-            await self.browser_manager.remove_session(session_id)
+            await self.browser_manager.release_session(session_id)
             self._current_session = None
 
             return f"浏览器会话 {session_id} 已关闭"
@@ -99,6 +220,14 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
+
+            # 静态页面走HTTP快速通道，浏览器导航推迟到真正需要页面时
+            if self._http_fast_path and wait_until != "networkidle":
+                dom = await try_http_fetch(session.context.request, url, session.timeout)
+                if dom is not None:
+                    session.defer_navigation(url, dom, wait_until)
+                    return f"成功导航到: {url}"
+
             await session.navigate(url, wait_until)
             return f"成功导航到: {url}"
 
@@ -124,10 +253,11 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
-            page = session.page
+            await session.ensure_navigated()
 
             timeout = timeout or session.timeout
-            await page.click(selector, timeout=timeout, force=force)
+            await session.get_locator(selector).click(timeout=timeout, force=force)
+            session.snapshot_cache.invalidate()
 
             return f"成功点击元素: {selector}"
 
@@ -153,10 +283,11 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
-            page = session.page
+            await session.ensure_navigated()
 
             timeout = timeout or session.timeout
-            await page.fill(selector, text, timeout=timeout)
+            await session.get_locator(selector).fill(text, timeout=timeout)
+            session.snapshot_cache.invalidate()
 
             return f"成功填写输入框 {selector}: {text}"
 
@@ -180,15 +311,17 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
-            page = session.page
+            if session.http_dom is not None:
+                node = select_first(session.http_dom, selector)
+                if node is not None:
+                    return node.text() or ""
 
-            timeout = timeout or session.timeout
-            element = await page.wait_for_selector(selector, timeout=timeout)
+            await session.ensure_navigated()
 
-            if element:
-                text = await element.text_content()
-                return text or ""
-            return "元素未找到"
+            timeout = timeout or session.timeout
+            # locator 在一次调用中完成等待和读取
+            text = await session.get_locator(selector).text_content(timeout=timeout)
+            return text or ""
 
         except PlaywrightTimeoutError:
             return f"获取文本内容超时: {selector}"
@@ -212,15 +345,16 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
-            page = session.page
+            if session.http_dom is not None:
+                node = select_first(session.http_dom, selector)
+                if node is not None:
+                    return node.attributes.get(attribute) or ""
 
-            timeout = timeout or session.timeout
-            element = await page.wait_for_selector(selector, timeout=timeout)
+            await session.ensure_navigated()
 
-            if element:
-                value = await element.get_attribute(attribute)
-                return value or ""
-            return "元素未找到"
+            timeout = timeout or session.timeout
+            value = await session.get_locator(selector).get_attribute(attribute, timeout=timeout)
+            return value or ""
 
         except PlaywrightTimeoutError:
             return f"获取属性超时: {selector}"
@@ -232,7 +366,7 @@ class BrowserTools:
         self,
         path: Optional[str] = None,
         full_page: bool = False,
-        quality: int = 80
+        quality: Optional[int] = 80
     ) -> str:
         """
         截取页面截图
@@ -240,23 +374,31 @@ class BrowserTools:
         Args:
             path: 保存路径(可选)
             full_page: 是否截取整页
-            quality: 图片质量(1-100)
+            quality: JPEG图片质量(1-100)，未提供路径时为空则返回PNG
         """
         try:
             session = self._get_current_session()
+            await session.ensure_navigated()
 
+            if path:
+                # 由 Playwright 直接写入文件，不在返回值中携带图片数据
+                await session.take_screenshot(
+                    path=path,
+                    full_page=full_page,
+                    quality=quality if path.endswith(('.jpg', '.jpeg')) else None,
+                    return_bytes=False
+                )
+                return f"截图已保存到: {path} ({os.path.getsize(path)} bytes)"
+
+            # 返回base64编码的截图，默认使用体积更小的JPEG
+            image_type = "png" if quality is None else "jpeg"
             screenshot_bytes = await session.take_screenshot(
-                path=path,
                 full_page=full_page,
-                quality=quality if path and (path.endswith('.jpg') or path.endswith('.jpeg')) else None
+                quality=quality,
+                image_type=image_type
             )
-
-            if path:
-                return f"截图已保存到: {path}"
-            else:
-                # 返回base64编码的截图
-                screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
-                return f"data:image/png;base64,{screenshot_b64}"
+            screenshot_b64 = base64.b64encode(memoryview(screenshot_bytes)).decode('ascii')
+            return f"data:image/{image_type};base64,{screenshot_b64}"
 
         except Exception as e:
             logger.error(f"截图失败: {e}")
@@ -278,10 +420,10 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
-            page = session.page
+            await session.ensure_navigated()
 
             timeout = timeout or session.timeout
-            await page.wait_for_selector(selector, timeout=timeout, state=state)
+            await session.get_locator(selector).wait_for(timeout=timeout, state=state)
 
             return f"元素已出现: {selector}"
 
@@ -300,14 +442,21 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
+            await session.ensure_navigated()
             page = session.page
 
             result = await page.evaluate(code)
 
-            if result is not None:
-                return json.dumps(result, ensure_ascii=False, indent=2)
-            else:
+            if result is None:
                 return "JavaScript执行成功"
+            # 基本类型直接转字符串，布尔值保持 JSON 写法
+            if isinstance(result, bool):
+                return "true" if result else "false"
+            if isinstance(result, (str, int, float)):
+                return str(result)
+            if orjson is not None:
+                return orjson.dumps(result).decode()
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
 
         except Exception as e:
             logger.error(f"JavaScript执行失败: {e}")
@@ -317,10 +466,13 @@ class BrowserTools:
         """获取页面标题"""
         try:
             session = self._get_current_session()
-            page = session.page
+            if session.http_dom is not None:
+                node = select_first(session.http_dom, "title")
+                if node is not None:
+                    return node.text(strip=True)
 
-            title = await page.title()
-            return title
+            snapshot = await self.page_snapshot(["title"])
+            return snapshot["title"]
 
         except Exception as e:
             logger.error(f"获取页面标题失败: {e}")
@@ -330,14 +482,30 @@ class BrowserTools:
         """获取当前页面URL"""
         try:
             session = self._get_current_session()
-            page = session.page
-
-            return page.url
+            return session.current_url
 
         except Exception as e:
             logger.error(f"获取页面URL失败: {e}")
             return f"获取页面URL失败: {str(e)}"
 
+    async def page_snapshot(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        通过一次 page.evaluate 读取多个页面字段
+
+        Args:
+            keys: 字段名 (title, url, ready)
+        """
+        keys = tuple(keys)
+        session = self._get_current_session()
+        cached = session.snapshot_cache.lookup(keys)
+        if cached is not None:
+            return cached
+
+        await session.ensure_navigated()
+        values = await session.page.evaluate(_snapshot_expression(keys))
+        session.snapshot_cache.update(values)
+        return values
+
     def get_session_status(self) -> Dict[str, Any]:
         """获取会话状态"""
         if not self._current_session:
@@ -354,13 +522,69 @@ class BrowserTools:
             "viewport": self._current_session.viewport,
             "timeout": self._current_session.timeout
         }
-    def decode_quoted_printable_html(self, html_str: str) -> str:
+
+    async def _replay_table_skill(
+        self,
+        session: BrowserSession,
+        tool_name: str,
+        entry_url: str,
+        selector: str
+    ) -> Optional[str]:
+        """回放已缓存的查询技能，命中时返回表格HTML，未命中返回None"""
+        # 不知道登入帳號时无法确定技能归属，不回放
+        if not self._skill_cache or not session.account:
+            return None
+
+        domain = urlsplit(entry_url).netloc
+        action_sig = SkillCache.signature(tool_name, selector, entry_url, session.account)
+        skill = self._skill_cache.lookup(domain, action_sig)
+        if not skill:
+            return None
+
+        try:
+            status, html = await skill.execute(session.context.request)
+            table_html = None
+            if status == skill.status:
+                table_html = await session.page.evaluate(_REPLAY_TABLE_JS, [html, selector])
+        except Exception as e:
+            logger.warning(f"回放技能失败: {e}")
+            table_html = None
+
+        if table_html is None:
+            self._skill_cache.invalidate(domain, action_sig)
+        return table_html
+
+    async def _record_table_skill(
+        self,
+        session: BrowserSession,
+        recorder: NavigationRecorder,
+        tool_name: str,
+        entry_url: str,
+        selector: str
+    ) -> None:
+        """将查询流程最终页面的导航请求记录为技能"""
+        request = recorder.last_request
+        # 只有表格位于主框架最终页面时才能通过回放请求取得
+        if not self._skill_cache or not session.account:
+            return
+        if not request or request.url != recorder.page.url:
+            return
+
+        try:
+            await self._skill_cache.record(
+                urlsplit(entry_url).netloc,
+                SkillCache.signature(tool_name, selector, entry_url, session.account),
+                request
+            )
+        except Exception as e:
+            logger.warning(f"记录技能失败: {e}")
+
+    async def decode_quoted_printable_html(self, html_str: str) -> str:
         """解码包含Quoted-Printable编码的HTML字符串"""
-        # 先解码整个字符串
+        # quopri.decodestring 只接受 bytes；解码在线程中执行，避免大页面阻塞事件循环
         try:
-            decoded_bytes = quopri.decodestring(html_str)
-            decoded_str = decoded_bytes.decode('utf-8')
-            return decoded_str
+            decoded_bytes = await asyncio.to_thread(quopri.decodestring, html_str.encode('utf-8'))
+            return decoded_bytes.decode('utf-8')
         except Exception as e:
             logger.error(f"解码HTML失败: {e}")
             return html_str
@@ -373,12 +597,12 @@ class BrowserTools:
         """
         try:
             session = self._get_current_session()
+            await session.ensure_navigated()
             page = session.page
-            randered_html = page.content()
-            randered_html = await randered_html
-            #decoded_randered_html = self.decode_quoted_printable_html(randered_html)
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(randered_html)
+            randered_html = await page.content()
+            #decoded_randered_html = await self.decode_quoted_printable_html(randered_html)
+            # 在线程中写文件，避免大页面阻塞事件循环
+            await asyncio.to_thread(Path(filename).write_text, randered_html, encoding='utf-8')
 
             return f"页面已保存到{filename}"
 
@@ -390,38 +614,16 @@ class BrowserTools:
         """保存当前页面的快照"""
         try:
             session = self._get_current_session()
+            await session.ensure_navigated()
             snapshot = await session.page.locator("body").aria_snapshot()
-            # 轉換為 YAML 字符串（簡化版本）
-            import yaml
-            yaml_str = snapshot
-            lines = yaml_str.split('\n')
-            enhanced_lines = []
-            ref_counter = 1
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                
-                if line.strip() and not line.strip().startswith('#'):
-                    # 計算 level_counter
-                    leading_spaces = len(line) - len(line.lstrip())
-                    level_counter = leading_spaces // 2
-                    
-                    # 識別列表項（真正的元素）
-                    stripped_line = line.strip()
-                    if stripped_line.startswith('- '):
-                        # 在行末添加屬性
-                        enhanced_line = f"{line} [ref=e{ref_counter}] [level={level_counter}]"
-                        ref_counter += 1
-                        enhanced_lines.append(enhanced_line)
-                    else:
-                        enhanced_lines.append(line)
-                else:
-                    enhanced_lines.append(line)
-                
-                i += 1
-            
-            yaml_str = '\n'.join(enhanced_lines)
+            # 在每個列表項（真正的元素）行末添加 ref 和 level 屬性
+            counter = itertools.count(1)
+
+            def add_ref(match: re.Match) -> str:
+                level = len(match.group("ind")) // 2
+                return f"{match.group(0)} [ref=e{next(counter)}] [level={level}]"
+
+            yaml_str = _SNAP_RE.sub(add_ref, snapshot)
             return f"页面快照: {yaml_str}"
         except Exception as e:
             logger.error(f"保存页面快照失败: {e}")
@@ -431,15 +633,18 @@ class BrowserTools:
         """登入教師帳號"""
         try:
             session = self._get_current_session()
-            page = session.page
-            await page.goto("https://fac.tumt.edu.tw/personal/personal/", wait_until="networkidle")
-            await page.locator("input[name=\"sID\"]").click()
-            await page.locator("input[name=\"sID\"]").fill("hyshiah")
-            await page.locator("#sPassword").click()
-            await page.locator("#sPassword").fill("Aa123456")
-            await page.get_by_role("button", name="登入本校個人網頁").click()
+            await session.navigate(_TEACHER_LOGIN_URL)
+
+            account_input = session.get_locator(_ACCOUNT_INPUT)
+            password_input = session.get_locator(_TEACHER_PASSWORD_INPUT)
+            login_button = session.get_by_role("button", _LOGIN_BUTTON_NAME)
+            # fill 会自行聚焦输入框，无需先点击
+            await account_input.fill(account)
+            await password_input.fill(password)
+            await login_button.click()
             # 等待導師系統連結出現以確認登入成功
-            await page.get_by_role("link", name="導師系統").wait_for(timeout=10000)
+            await session.get_by_role("link", "導師系統").wait_for(timeout=10000)
+            session.account = account
             return f"教師帳號 {account} 登入成功"
         except Exception as e:
             logger.error(f"教師帳號登入失敗: {e}")
@@ -449,14 +654,16 @@ class BrowserTools:
         """登入學生帳號"""
         try:
             session = self._get_current_session()
-            page = session.page
+            await session.navigate(_STUDENT_LOGIN_URL)
 
-            await page.goto("https://std.tumt.edu.tw/personal/pstudent/login.aspx", wait_until="networkidle")
-            await page.locator("input[name=\"sID\"]").click()
-            await page.locator("input[name=\"sID\"]").fill(account)
-            await page.locator("input[name=\"sStd_Pw\"]").click()
-            await page.locator("input[name=\"sStd_Pw\"]").fill(password)
-            await page.get_by_role("button", name="登入本校個人網頁").click()
+            account_input = session.get_locator(_ACCOUNT_INPUT)
+            password_input = session.get_locator(_STUDENT_PASSWORD_INPUT)
+            login_button = session.get_by_role("button", _LOGIN_BUTTON_NAME)
+            # fill 会自行聚焦输入框，无需先点击
+            await account_input.fill(account)
+            await password_input.fill(password)
+            await login_button.click()
+            session.account = account
 
             return f"學生帳號 {account} 登入成功"
 
@@ -473,64 +680,22 @@ class BrowserTools:
             page = session.page
 
             # 假设请假名单在一个特定的表格中
-            await page.goto("https://fac.tumt.edu.tw/personal/personal/Index.aspx", wait_until="networkidle")
-            await page.get_by_role("link", name="導師系統").click(timeout=10000)
-            await page.get_by_role("link", name="學生請假審核").click(timeout=10000)
-            table_js = """
-
-                (selector) => {{
-                            const element = document.querySelector(selector);
-                            if (!element) return "元素未找到";
-                            
-                            // 複製元素以避免修改原內容
-                            const clone = element.cloneNode(true);
-                            
-                            // 移除所有屬性的函數
-                            function removeAllAttributes(element) {{
-                                // 移除當前元素的所有屬性
-                                const attributes = element.getAttributeNames();
-                                for (const attr of attributes) {{
-                                    element.removeAttribute(attr);
-                                }}
-                                
-                                // 遞迴處理所有子元素
-                                for (const child of element.children) {{
-                                    removeAllAttributes(child);
-                                }}
-                            }}
-                            
-                            removeAllAttributes(clone);
-                            return clone.outerHTML;
-                        }}
-            """
+            entry_url = _TEACHER_INDEX_URL
             selector = "table.table"
-            await page.wait_for_selector(selector)
-            table_html = await page.evaluate(table_js, selector)
-
-            import re
-            def remove_all_control_chars(text):
-                """移除所有控制字符和多餘空白"""
-                # 方法 1A: 移除特定控制字符並壓縮空白
-                cleaned = re.sub(r'[\n\t\u3000]+', ' ', text)
-                cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-                return cleaned
-            
-            def remove_unicode_control_chars(text):
-                """使用Unicode類別移除所有控制字符"""
-                # \p{C} 匹配所有Unicode控制字符
-                # 需要 regex 模組（比 re 更強大）
-                try:
-                    import regex
-                    cleaned = regex.sub(r'\p{C}+', ' ', text)
-                    cleaned = regex.sub(r'\s+', ' ', cleaned).strip()
-                    return cleaned
-                except ImportError:
-                    # 降級到標準 re
-                    return remove_all_control_chars(text)
-            
-            clean_html = remove_unicode_control_chars(table_html)
-
-            return f"获取学生请假名单: {clean_html}"
+            table_html = await self._replay_table_skill(
+                session, "get_student_leave_list", entry_url, selector
+            )
+            if table_html is None:
+                with NavigationRecorder(page) as recorder:
+                    await session.navigate(entry_url)
+                    await page.get_by_role("link", name="導師系統").click(timeout=10000)
+                    await page.get_by_role("link", name="學生請假審核").click(timeout=10000)
+                    await page.wait_for_selector(selector)
+                    table_html = await page.evaluate(_STRIP_ATTRS_JS, selector)
+                await self._record_table_skill(
+                    session, recorder, "get_student_leave_list", entry_url, selector
+                )
+            return f"获取学生请假名单: {table_html}"
 
         except Exception as e:
             logger.error(f"获取学生请假名单失败: {e}")
@@ -540,13 +705,10 @@ class BrowserTools:
         try:
             session = self._get_current_session()
             page = session.page
-            import re
-            pattern = f'.*{name_info}.*{time_info}.*'
-            #re.compile(r'pattern')
-            await page.goto("https://fac.tumt.edu.tw/personal/Teacher/qry/AbsPer.aspx", wait_until="networkidle")
+            await session.navigate(_LEAVE_REVIEW_URL)
             if isinstance(name_info, str) and isinstance(time_info, str):               
                 await page.get_by_role("row", name= name_info ).filter(has_text=time_info).get_by_role("link").click()
-                await page.get_by_role("button", name="允許請假").click()
+                await session.get_by_role("button", "允許請假").click()
                 return f"已接受學生 {name_info} 的請假申請"
             else:
                 return "請提供學生姓名以接受請假申請"
@@ -559,63 +721,23 @@ class BrowserTools:
             session = self._get_current_session()
             page = session.page
 
-            await page.goto("https://fac.tumt.edu.tw/personal/Instructor/index.aspx", wait_until="networkidle")
-            await page.get_by_role("link", name="教室日誌未填及未輸入缺曠查詢").click(timeout=10000)
-            await page.get_by_role("button", name="確定").click(timeout=10000)
+            entry_url = _INSTRUCTOR_INDEX_URL
             selector = "body > div:nth-child(7) > table"
-            table_js = """
-
-                (selector) => {{
-                            const element = document.querySelector(selector);
-                            if (!element) return "元素未找到";
-                            
-                            // 複製元素以避免修改原內容
-                            const clone = element.cloneNode(true);
-                            
-                            // 移除所有屬性的函數
-                            function removeAllAttributes(element) {{
-                                // 移除當前元素的所有屬性
-                                const attributes = element.getAttributeNames();
-                                for (const attr of attributes) {{
-                                    element.removeAttribute(attr);
-                                }}
-                                
-                                // 遞迴處理所有子元素
-                                for (const child of element.children) {{
-                                    removeAllAttributes(child);
-                                }}
-                            }}
-                            
-                            removeAllAttributes(clone);
-                            return clone.outerHTML;
-                        }}
-            """
-            
-            import re
-            def remove_all_control_chars(text):
-                """移除所有控制字符和多餘空白"""
-                # 方法 1A: 移除特定控制字符並壓縮空白
-                cleaned = re.sub(r'[\n\t\u3000]+', ' ', text)
-                cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-                return cleaned
-            
-            def remove_unicode_control_chars(text):
-                """使用Unicode類別移除所有控制字符"""
-                # \p{C} 匹配所有Unicode控制字符
-                # 需要 regex 模組（比 re 更強大）
-                try:
-                    import regex
-                    cleaned = regex.sub(r'\p{C}+', ' ', text)
-                    cleaned = regex.sub(r'\s+', ' ', cleaned).strip()
-                    return cleaned
-                except ImportError:
-                    # 降級到標準 re
-                    return remove_all_control_chars(text)
-          
-            await page.wait_for_selector(selector)
-            table_html = await page.evaluate(table_js, selector)
-            clean_html = remove_unicode_control_chars(table_html)
-            return f"获取教師日誌未填紀錄: {clean_html}"
+            table_html = await self._replay_table_skill(
+                session, "Classroom_log_not_filled_inquiry", entry_url, selector
+            )
+
+            if table_html is None:
+                with NavigationRecorder(page) as recorder:
+                    await session.navigate(entry_url)
+                    await page.get_by_role("link", name="教室日誌未填及未輸入缺曠查詢").click(timeout=10000)
+                    await page.get_by_role("button", name="確定").click(timeout=10000)
+                    await page.wait_for_selector(selector)
+                    table_html = await page.evaluate(_STRIP_ATTRS_JS, selector)
+                await self._record_table_skill(
+                    session, recorder, "Classroom_log_not_filled_inquiry", entry_url, selector
+                )
+            return f"获取教師日誌未填紀錄: {table_html}"
         except Exception as e:
             logger.error(f"获取教師日誌未填紀錄失败: {e}")
             return f"获取教師日誌未填紀錄失败: {str(e)}"
@@ -630,40 +752,49 @@ class BrowserTools:
                 #print(dialog.message)
                 await dialog.accept()
 
-            await page.goto("https://fac.tumt.edu.tw/personal/Instructor/index.aspx", wait_until="networkidle")
+            await session.navigate(_INSTRUCTOR_INDEX_URL)
             await page.get_by_role("link", name="曠課登錄(含教室日誌)").click()
             await page.locator("select[name=\"Month\"]").select_option(month)
             await page.locator("select[name=\"Day\"]").select_option(day)
             await page.get_by_role("button", name="查詢").click()
+            # 等待查詢结果中的勾选框出现，没有任何记录时视为已填寫完畢
+            try:
+                await page.locator(f"{_LOG_CHECK_CELLS} input[type=checkbox]").first.wait_for(
+                    state="attached", timeout=5000
+                )
+            except PlaywrightTimeoutError:
+                return f"{month} {day} 教室日誌填寫完畢"
 
+            # 每次儲存后页面会重新载入，重新查找第一个未勾选的行；已处理的行不再重复填写
+            done: List[int] = []
+            # 所有行共用一个对话框处理器，结束后移除
+            page.on("dialog", handle_dialog)
             try:
-                row = 1
                 while True:
-                    row += 1 
-                    locator = page.locator(f"tr:nth-child({row}) > td:nth-child(3)").get_by_role("checkbox")
-                    if not await locator.is_checked(timeout=5000):
-                        page.on("dialog", handle_dialog)
-                        await page.locator(f"tr:nth-child({row}) > td:nth-child(3)").click()
-                        text = await page.locator("#AutoNumber1 > tbody > tr:nth-child(6) > td:nth-child(2) > font > textarea").input_value()
-                        # if isinstance(text, list):
-                        #     text_string = "".join(text)
-                        # else:
-                        #     text_string = text
-
-                        if text.strip() == "":
-                            await page.locator("#AutoNumber1 > tbody > tr:nth-child(7) > td:nth-child(2) > textarea").fill("導師課")
-                        else:
-                            await page.get_by_role("button", name="同上").click()
-                        await page.locator("select[name=\"IsBeforeClear\"]").select_option("Y")
-                        await page.locator("select[name=\"IsAfterClear\"]").select_option("Y")
-                        await page.get_by_role("button", name="儲存").click()
-                        logger.info(f"已填寫第 {row-1} 筆教室日誌 {text}")
+                    cell = (await page.evaluate_handle(_NEXT_UNCHECKED_LOG_CELL_JS, done)).as_element()
+                    if cell is None:
+                        break
+                    # 行号即教室日誌的筆數（第 0 行为表头）
+                    entry = await cell.evaluate("td => td.parentElement.rowIndex")
+                    done.append(entry)
+
+                    await cell.click()
+                    text = await session.get_locator("#AutoNumber1 > tbody > tr:nth-child(6) > td:nth-child(2) > font > textarea").input_value()
+
+                    if text.strip() == "":
+                        await session.get_locator("#AutoNumber1 > tbody > tr:nth-child(7) > td:nth-child(2) > textarea").fill("導師課")
+                    else:
+                        await session.get_by_role("button", "同上").click()
+                    await session.get_locator("select[name=\"IsBeforeClear\"]").select_option("Y")
+                    await session.get_locator("select[name=\"IsAfterClear\"]").select_option("Y")
+                    async with page.expect_navigation(wait_until="domcontentloaded"):
+                        await session.get_by_role("button", "儲存").click()
+                    logger.info(f"已填寫第 {entry} 筆教室日誌 {text}")
+            finally:
+                page.remove_listener("dialog", handle_dialog)
+
+            return f"{month} {day} 教室日誌填寫完畢"
 
-                
-            except PlaywrightTimeoutError:
-                
-                return f"{month} {day} 教室日誌填寫完畢"
-            
         except Exception as e:
             logger.error(f"填寫教室日誌失敗: {e}")
             return f"填寫教室日誌失敗: {str(e)}"
@@ -673,63 +804,22 @@ class BrowserTools:
             session = self._get_current_session()
             page = session.page
 
-            await page.goto("https://std.tumt.edu.tw/personal/pstudent/Index.aspx?test2=Y", wait_until="networkidle")
-            await page.get_by_role("link", name="請假缺曠查詢").click()
-
+            entry_url = _STUDENT_INDEX_URL
             selector = "body > center:nth-child(10) > table"
-            table_js = """
-
-                (selector) => {{
-                            const element = document.querySelector(selector);
-                            if (!element) return "元素未找到";
-                            
-                            // 複製元素以避免修改原內容
-                            const clone = element.cloneNode(true);
-                            
-                            // 移除所有屬性的函數
-                            function removeAllAttributes(element) {{
-                                // 移除當前元素的所有屬性
-                                const attributes = element.getAttributeNames();
-                                for (const attr of attributes) {{
-                                    element.removeAttribute(attr);
-                                }}
-                                
-                                // 遞迴處理所有子元素
-                                for (const child of element.children) {{
-                                    removeAllAttributes(child);
-                                }}
-                            }}
-                            
-                            removeAllAttributes(clone);
-                            return clone.outerHTML;
-                        }}
-            """
-            
-            import re
-            def remove_all_control_chars(text):
-                """移除所有控制字符和多餘空白"""
-                # 方法 1A: 移除特定控制字符並壓縮空白
-                cleaned = re.sub(r'[\n\t\u3000]+', ' ', text)
-                cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-                return cleaned
-            
-            def remove_unicode_control_chars(text):
-                """使用Unicode類別移除所有控制字符"""
-                # \p{C} 匹配所有Unicode控制字符
-                # 需要 regex 模組（比 re 更強大）
-                try:
-                    import regex
-                    cleaned = regex.sub(r'\p{C}+', ' ', text)
-                    cleaned = regex.sub(r'\s+', ' ', cleaned).strip()
-                    return cleaned
-                except ImportError:
-                    # 降級到標準 re
-                    return remove_all_control_chars(text)
-          
-            await page.wait_for_selector(selector)
-            table_html = await page.evaluate(table_js, selector)
-            clean_html = remove_unicode_control_chars(table_html)
-            return f"获取曠課紀錄: {clean_html}"
+            table_html = await self._replay_table_skill(
+                session, "Student_Truancy_Record_inquiry", entry_url, selector
+            )
+
+            if table_html is None:
+                with NavigationRecorder(page) as recorder:
+                    await session.navigate(entry_url)
+                    await page.get_by_role("link", name="請假缺曠查詢").click()
+                    await page.wait_for_selector(selector)
+                    table_html = await page.evaluate(_STRIP_ATTRS_JS, selector)
+                await self._record_table_skill(
+                    session, recorder, "Student_Truancy_Record_inquiry", entry_url, selector
+                )
+            return f"获取曠課紀錄: {table_html}"
         except Exception as e:
             logger.error(f"获取曠課紀錄失败: {e}")
             return f"获取曠課紀錄失败: {str(e)}"
@@ -749,7 +839,7 @@ class BrowserTools:
             session = self._get_current_session()
             page = session.page
 
-            await page.goto("https://std.tumt.edu.tw/personal/pstudent/Index.aspx?test2=Y", wait_until="networkidle")
+            await session.navigate(_STUDENT_INDEX_URL)
             async with page.expect_popup() as page1_info:
                 await page.get_by_role("link", name="學生請假單").click()
 
@@ -766,7 +856,10 @@ class BrowserTools:
             await page1.locator("select[name=\"Hcode\"]").select_option("AC")
             await page1.locator("input[name=\"Reason\"]").fill("有事")
             page1.on("dialog", handle_dialog)
-            await page1.get_by_role("button", name="送出").click()
+            try:
+                await page1.get_by_role("button", name="送出").click()
+            finally:
+                page1.remove_listener("dialog", handle_dialog)
 
             return f"已送出學生請假申請: {month}月 {date}日 第 {start_sec} 節 至 第 {end_sec} 節 - 系統回應: {dialog_message}"
         except Exception as e:
@@ -778,17 +871,18 @@ class BrowserTools:
             session = self._get_current_session()
             page = session.page
 
-            await page.goto("https://fac.tumt.edu.tw/personal/Teacher/qry/AbsPer.aspx", wait_until="networkidle")
+            await session.navigate(_LEAVE_REVIEW_URL)
             if info:
                 if isinstance(info, str):
                     name = info
                     await page.get_by_role("cell", name = name).click()
                 elif isinstance(info, dict):
-                    await page.get_by_role("row", name=f"{info["class"]} {info["number"]} {info["name"]} {info["kind"]} {info["time"]} {info["teacher"]}").get_by_role("link").click()
+                    row_name = " ".join(_LEAVE_ROW_FIELDS(info))
+                    await page.get_by_role("row", name=row_name).get_by_role("link").click()
                     name = info['name']
                 else:
                     raise ValueError("info must be a string or dictionary")
-                await page.get_by_role("button", name="允許請假").click()
+                await session.get_by_role("button", "允許請假").click()
 
                 #await page.wait_for_url(url = "https://fac.tumt.edu.tw/personal/Teacher/qry/AbsPer.aspx", timeout=10000)
                 
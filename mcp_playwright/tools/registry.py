@@ -0,0 +1,54 @@
+"""
+工具注册表 - Playwright MCP Server
+
+集中维护 MCP 工具的名称、分类和简述，供工具注册、帮助资源和提示模板共用
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+# (工具名, 分类, 简述)
+TOOL_SPECS: Tuple[Tuple[str, str, str], ...] = (
+    ("create_browser_session", "浏览器控制", "创建新的浏览器会话"),
+    ("close_browser_session", "浏览器控制", "关闭当前浏览器会话"),
+    ("navigate_to_url", "浏览器控制", "导航到指定URL"),
+    ("click_element", "页面交互", "点击页面元素"),
+    ("fill_input", "页面交互", "填写输入框"),
+    ("wait_for_selector", "页面交互", "等待元素出现"),
+    ("get_text_content", "数据提取", "获取元素文本内容"),
+    ("get_element_attribute", "数据提取", "获取元素属性值"),
+    ("get_page_title", "数据提取", "获取页面标题"),
+    ("get_page_url", "数据提取", "获取当前页面URL"),
+    ("take_screenshot", "高级功能", "截取页面截图"),
+    ("execute_javascript", "高级功能", "执行JavaScript代码"),
+    ("save_page_to_file", "高级功能", "将当前页面保存为HTML文件"),
+    ("snapshot", "高级功能", "获取当前页面的快照"),
+    ("login_teacher_account", "教師管理", "登入教師帳號"),
+    ("Student_Leaved_List", "教師管理", "查詢學生已請假名單"),
+    ("Accept_Student_Leave_Request", "教師管理", "同意學生請假"),
+    ("Class_log_not_filled_inquire", "教師管理", "查詢教室日誌未填及未輸入缺曠清單"),
+    ("auto_fill_classroom_log", "教師管理", "自動填寫教室日誌"),
+    ("login_student_account", "學生請假", "登入學生帳號"),
+    ("student_Truancy_Record", "學生請假", "查詢學生曠課紀錄"),
+    ("fill_Student_Leave_application", "學生請假", "填寫學生請假申請單"),
+)
+
+TOOL_SUMMARIES: Dict[str, str] = {name: summary for name, _, summary in TOOL_SPECS}
+
+# 教師/學生流程完成后都需要关闭会话
+_WORKFLOW_CATEGORIES = ("教師管理", "學生請假")
+
+
+def describe_tools(names: Iterable[str]) -> List[str]:
+    """生成 "工具名 简述" 形式的工具说明列表"""
+    return [f"{name} {TOOL_SUMMARIES[name]}" for name in names]
+
+
+def tools_help() -> Dict[str, Dict[str, str]]:
+    """按分类生成工具帮助信息"""
+    help_info: Dict[str, Dict[str, str]] = {}
+    for name, category, summary in TOOL_SPECS:
+        help_info.setdefault(category, {})[name] = summary
+
+    for category in _WORKFLOW_CATEGORIES:
+        help_info[category]["close_browser_session"] = "完成後关闭当前浏览器会话"
+    return help_info
@@ -3,63 +3,102 @@
 发布脚本 - 自动化版本更新和标签创建
 """
 
+import argparse
 import re
+import shlex
 import subprocess
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
+try:
+    import tomllib
+except ImportError:
+    # Python 3.10 没有 tomllib，退回到正则匹配
+    tomllib = None
 
-def get_current_version() -> str:
-    """获取当前版本号"""
+# 版本号所在行（仅在没有 tomllib 时使用）
+_PYPROJECT_VERSION_RE = re.compile(r'version = "([^"]+)"')
+
+# 跳过 Git 钩子的配置项（提交和创建标签共用）
+_NO_HOOKS_CONFIG = ["-c", "core.hooksPath=/dev/null"]
+
+
+def get_current_version() -> Tuple[str, str]:
+    """获取当前版本号及 pyproject.toml 的内容"""
     pyproject_path = Path("pyproject.toml")
-    if not pyproject_path.exists():
-        raise FileNotFoundError("pyproject.toml 文件不存在")
+    try:
+        content = pyproject_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise FileNotFoundError("pyproject.toml 文件不存在") from None
 
-    content = pyproject_path.read_text(encoding="utf-8")
-    match = re.search(r'version = "([^"]+)"', content)
-    if not match:
+    if tomllib is not None:
+        version = tomllib.loads(content).get("project", {}).get("version")
+    else:
+        match = _PYPROJECT_VERSION_RE.search(content)
+        version = match.group(1) if match else None
+    if not version:
         raise ValueError("无法从 pyproject.toml 中找到版本号")
 
-    return match.group(1)
+    # 内容一并返回，写入时在原文上替换版本号（tomllib 不支持写入）
+    return version, content
+
+
+def replace_version(content: str, key: str, old_version: str, new_version: str) -> str:
+    """将 key = "旧版本" 替换为 key = "新版本"，找不到旧版本时报错"""
+    old = f'{key} = "{old_version}"'
+    if old not in content:
+        raise ValueError(f"未找到 {old}，版本号不一致")
+    return content.replace(old, f'{key} = "{new_version}"', 1)
 
 
 def update_version_in_file(file_path: Path, old_version: str, new_version: str) -> None:
-    """更新文件中的版本号"""
+    """更新 __init__.py 中的版本号"""
     content = file_path.read_text(encoding="utf-8")
-
-    if file_path.name == "pyproject.toml":
-        content = re.sub(
-            r'version = "[^"]+"',
-            f'version = "{new_version}"',
-            content
-        )
-    elif file_path.name == "__init__.py":
-        content = re.sub(
-            r'__version__ = "[^"]+"',
-            f'__version__ = "{new_version}"',
-            content
-        )
+    content = replace_version(content, "__version__", old_version, new_version)
 
     file_path.write_text(content, encoding="utf-8")
     print(f"✅ 已更新 {file_path}")
 
 
-def run_command(command: str) -> bool:
-    """运行命令并返回是否成功"""
+def update_pyproject_version(
+    pyproject_path: Path,
+    content: str,
+    old_version: str,
+    new_version: str
+) -> None:
+    """根据已读取的内容更新 pyproject.toml 中的版本号"""
+    content = replace_version(content, "version", old_version, new_version)
+
+    pyproject_path.write_text(content, encoding="utf-8")
+    print(f"✅ 已更新 {pyproject_path}")
+
+
+def run_command(argv: List[str]) -> bool:
+    """运行命令并返回是否成功（不经过 shell）"""
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
+        # 标准输出直接写到终端，只捕获错误输出用于失败提示
+        subprocess.run(
+            argv,
             check=True,
-            capture_output=True,
+            stderr=subprocess.PIPE,
             text=True
         )
         return True
     except subprocess.CalledProcessError as e:
-        print(f"❌ 命令执行失败: {command}")
+        print(f"❌ 命令执行失败: {shlex.join(argv)}")
         print(f"错误输出: {e.stderr}")
         return False
+    except OSError as e:
+        # 不经过 shell 时，命令不存在会直接抛出 FileNotFoundError
+        print(f"❌ 无法运行命令: {shlex.join(argv)}")
+        print(f"错误信息: {e}")
+        return False
+
+
+def run_commands(*commands: List[str]) -> bool:
+    """依次运行多个命令，遇到失败立即停止"""
+    return all(run_command(argv) for argv in commands)
 
 
 def increment_version(version: str, part: str) -> str:
@@ -85,19 +124,39 @@ def increment_version(version: str, part: str) -> str:
     return f"{major}.{minor}.{patch}"
 
 
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(
+        description="更新版本号、创建标签并推送到远程仓库",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "示例:\n"
+            "  python scripts/release.py 0.2.0    # 设置特定版本\n"
+            "  python scripts/release.py patch     # 递增补丁版本\n"
+            "  python scripts/release.py minor     # 递增次版本\n"
+            "  python scripts/release.py major     # 递增主版本"
+        )
+    )
+    parser.add_argument("version", help="新版本号，或 major/minor/patch")
+    parser.add_argument(
+        "-y",
+        "--yes",
+        action="store_true",
+        help="跳过确认提示，用于 CI 等非交互环境"
+    )
+    parser.add_argument(
+        "--no-hooks",
+        action="store_true",
+        help="提交和创建标签时跳过 Git 钩子和 GPG 签名"
+    )
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
-    if len(sys.argv) < 2:
-        print("用法: python scripts/release.py <version|major|minor|patch>")
-        print("示例:")
-        print("  python scripts/release.py 0.2.0    # 设置特定版本")
-        print("  python scripts/release.py patch     # 递增补丁版本")
-        print("  python scripts/release.py minor     # 递增次版本")
-        print("  python scripts/release.py major     # 递增主版本")
-        sys.exit(1)
-
-    version_arg = sys.argv[1]
-    current_version = get_current_version()
+    args = parse_args()
+    version_arg = args.version
+    current_version, pyproject_content = get_current_version()
 
     # 确定新版本号
     if version_arg in ["major", "minor", "patch"]:
@@ -109,54 +168,62 @@ def main():
     print(f"🚀 新版本: {new_version}")
 
     # 确认更新
-    confirm = input("确认要更新版本并创建标签吗? (y/N): ")
-    if confirm.lower() != 'y':
-        print("❌ 取消发布")
-        sys.exit(0)
+    if not args.yes:
+        confirm = input("确认要更新版本并创建标签吗? (y/N): ")
+        if confirm.lower() != 'y':
+            print("❌ 取消发布")
+            sys.exit(0)
 
     # 更新版本号
     pyproject_path = Path("pyproject.toml")
     init_path = Path("mcp_playwright/__init__.py")
 
-    update_version_in_file(pyproject_path, current_version, new_version)
+    update_pyproject_version(pyproject_path, pyproject_content, current_version, new_version)
     update_version_in_file(init_path, current_version, new_version)
 
     # 运行测试
     print("🧪 运行测试...")
-    if not run_command("uv run pytest tests/ -v"):
+    if not run_command(["uv", "run", "pytest", "tests/", "-v", "-n", "auto", "--dist=loadgroup"]):
         print("❌ 测试失败，中止发布")
         sys.exit(1)
 
-    # 构建包
+    # 构建包，构建只写入 dist/，在后台与 Git 提交同时进行
     print("📦 构建包...")
-    if not run_command("uv build"):
-        print("❌ 构建失败，中止发布")
-        sys.exit(1)
-
-    # 提交更改
-    print("💾 提交更改...")
-    if not run_command(f"git add pyproject.toml mcp_playwright/__init__.py"):
-        print("❌ Git 添加失败")
+    try:
+        build_proc = subprocess.Popen(["uv", "build"])
+    except OSError as e:
+        print(f"❌ 无法运行构建命令: {e}")
         sys.exit(1)
 
-    if not run_command(f'git commit -m "🔖 发布版本 v{new_version}"'):
-        print("❌ Git 提交失败")
+    # 提交更改并创建标签
+    print("💾 提交更改并创建标签...")
+    commit_config: List[str] = []
+    tag_config: List[str] = []
+    if args.no_hooks:
+        commit_config = ["-c", "commit.gpgSign=false", *_NO_HOOKS_CONFIG]
+        tag_config = ["-c", "tag.gpgSign=false", *_NO_HOOKS_CONFIG]
+    if not run_commands(
+        ["git", "add", "pyproject.toml", "mcp_playwright/__init__.py"],
+        ["git", *commit_config, "commit", "-m", f"🔖 发布版本 v{new_version}"],
+        ["git", *tag_config, "tag", f"v{new_version}"]
+    ):
+        build_proc.wait()
+        print("❌ Git 提交或创建标签失败")
         sys.exit(1)
 
-    # 创建标签
-    print("🏷️ 创建标签...")
-    if not run_command(f"git tag v{new_version}"):
-        print("❌ 创建标签失败")
+    if build_proc.wait() != 0:
+        # 撤销本地的标签和提交，保留版本号修改以便重试
+        run_commands(
+            ["git", "tag", "-d", f"v{new_version}"],
+            ["git", "reset", "--soft", "HEAD~1"]
+        )
+        print("❌ 构建失败，已撤销本地提交和标签，中止发布")
         sys.exit(1)
 
-    # 推送到远程
+    # 推送到远程，主分支和标签同时成功或同时失败
     print("📡 推送到远程仓库...")
-    if not run_command("git push origin main"):
-        print("❌ 推送主分支失败")
-        sys.exit(1)
-
-    if not run_command(f"git push origin v{new_version}"):
-        print("❌ 推送标签失败")
+    if not run_command(["git", "push", "--atomic", "origin", "main", f"v{new_version}"]):
+        print("❌ 推送主分支和标签失败")
         sys.exit(1)
 
     print(f"🎉 版本 v{new_version} 发布成功!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+提示模板及身份识别测试
+"""
+
+import pytest
+
+from mcp_playwright.prompt import fastmcp_template
+from mcp_playwright.prompt.fastmcp_template import MCPPromptClient
+from mcp_playwright.prompt.prompt_template import PromptTemplate, _compile_template
+
+
+@pytest.fixture(params=["automaton", "fallback"])
+def client(request, monkeypatch):
+    """分别测试关键词自动机和未安装 pyahocorasick 时的逐类扫描"""
+    if request.param == "automaton":
+        if fastmcp_template._IDENTITY_AUTOMATON is None:
+            pytest.skip("未安装 pyahocorasick")
+    else:
+        monkeypatch.setattr(fastmcp_template, "_IDENTITY_AUTOMATON", None)
+    return MCPPromptClient()
+
+
+@pytest.mark.parametrize("text, identity", [
+    ("老師要審核學生請假", "teacher_management"),
+    ("學生請假後重置", "student_management"),
+    ("重置对话", "reset"),
+    ("Teacher wants to RESET", "teacher_management"),
+    ("今天天气如何", "general_user"),
+])
+def test_identity_priority(client, text, identity):
+    """测试身份识别的优先级：教师 > 学生 > 重置，关键词不区分大小写"""
+    assert client._identify_user_identity(text) == identity
+
+
+def test_reset_clears_identity(client):
+    """测试重置指令清除已记住的身份并返回重置提示"""
+    client.identity_based_workflow("老師要審核學生請假")
+    assert client.identity == "teacher_management"
+
+    result = client.identity_based_workflow("reset please")
+
+    assert "已重置身份" in result
+    assert client.identity is None
+
+
+def make_template(template: str) -> PromptTemplate:
+    return PromptTemplate("test", "测试模板", template, [], {})
+
+
+def test_compile_template_escapes_braces():
+    """测试 {{参数}} 转为 format 占位符，其余花括号被转义"""
+    assert _compile_template('{"url": "{{url}}"}') == '{{"url": "{url}"}}'
+
+
+def test_render_keeps_literal_braces():
+    """测试渲染时只替换参数，JSON 等字面花括号原样保留"""
+    template = make_template('{"task": "{{task}}", "set": {a}}')
+
+    assert template.parameters == ["task"]
+    assert template.render(task="查詢") == '{"task": "查詢", "set": {a}}'
+
+
+def test_render_missing_parameter():
+    """测试缺少参数时抛出 ValueError"""
+    template = make_template("{{account}} / {{password}}")
+
+    with pytest.raises(ValueError, match="缺少必需的参数"):
+        template.render(account="teacher")
@@ -7,6 +7,9 @@
 
 import asyncio
 import logging
+
+import pytest_asyncio
+
 from mcp_playwright.core.browser_manager import BrowserManager
 from mcp_playwright.tools.browser_tools import BrowserTools
 
@@ -15,25 +18,31 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def test_core_functionality():
+def create_browser_manager() -> BrowserManager:
+    """创建测试用的浏览器管理器，只允许一个会话以便测试会话限制"""
+    return BrowserManager(
+        browser_type="chromium",
+        headless=True,
+        max_sessions=1,
+        default_viewport={"width": 1280, "height": 720},
+        default_timeout=30000
+    )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def browser_manager():
+    """所有测试共用一个浏览器管理器，只启动一次浏览器并预热一个会话"""
+    manager = create_browser_manager()
+    await manager.warm_up(count=1)
+    yield manager
+    await manager.cleanup()
+
+
+async def test_core_functionality(browser_manager: BrowserManager):
     """测试核心功能"""
     logger.info("🚀 开始测试 Playwright MCP Server 核心功能...")
 
     try:
-        # 测试浏览器管理器
-        logger.info("📋 测试 BrowserManager...")
-        browser_manager = BrowserManager(
-            browser_type="chromium",
-            headless=True,
-            max_sessions=5,
-            default_viewport={"width": 1280, "height": 720},
-            default_timeout=30000
-        )
-
-        # 初始化浏览器管理器
-        await browser_manager.initialize()
-        logger.info("✅ BrowserManager 初始化成功")
-
         # 测试会话创建
         session = await browser_manager.create_session()
         logger.info(f"✅ 会话创建成功: {session.session_id}")
@@ -42,9 +51,13 @@ async def test_core_functionality():
         await session.navigate("https://example.com")
         logger.info("✅ 页面导航成功")
 
-        # 测试截图
-        screenshot_bytes = await session.take_screenshot()
+        # 截图与健康检查互不依赖，并发执行
+        screenshot_bytes, health = await asyncio.gather(
+            session.take_screenshot(),
+            browser_manager.health_check()
+        )
         logger.info(f"✅ 截图成功: {len(screenshot_bytes)} bytes")
+        logger.info(f"✅ 健康检查: {health}")
 
         # 测试浏览器工具
         logger.info("📋 测试 BrowserTools...")
@@ -54,34 +67,22 @@ async def test_core_functionality():
         status = browser_tools.get_session_status()
         logger.info(f"✅ 会话状态: {status}")
 
-        # 测试健康检查
-        health = await browser_manager.health_check()
-        logger.info(f"✅ 健康检查: {health}")
-
-        # 清理资源
-        await browser_manager.cleanup()
-        logger.info("✅ 资源清理完成")
+        # 释放会话，预热池补充一个全新的上下文供后续测试使用
+        await browser_manager.release_session(session.session_id)
 
         logger.info("🎉 所有测试通过！")
         return True
 
     except Exception as e:
         logger.error(f"❌ 测试失败: {e}")
-        # 确保清理资源
-        try:
-            if 'browser_manager' in locals():
-                await browser_manager.cleanup()
-        except Exception as cleanup_error:
-            logger.error(f"清理资源时出错: {cleanup_error}")
         return False
 
 
-async def test_error_handling():
+async def test_error_handling(browser_manager: BrowserManager):
     """测试错误处理"""
     logger.info("🛡️ 测试错误处理...")
 
     try:
-        browser_manager = BrowserManager()
         browser_tools = BrowserTools(browser_manager)
 
         # 测试未初始化会话的错误处理
@@ -92,10 +93,7 @@ async def test_error_handling():
         except RuntimeError as e:
             logger.info(f"✅ 正确捕获错误: {e}")
 
-        # 测试超限会话创建
-        browser_manager.max_sessions = 1
-        await browser_manager.initialize()
-
+        # 测试超限会话创建：共用的管理器只允许一个会话
         session1 = await browser_manager.create_session()
         logger.info("✅ 第一个会话创建成功")
 
@@ -106,7 +104,8 @@ async def test_error_handling():
         except RuntimeError as e:
             logger.info(f"✅ 正确处理会话限制: {e}")
 
-        await browser_manager.cleanup()
+        await browser_manager.release_session(session1.session_id)
+
         logger.info("✅ 错误处理测试通过")
         return True
 
@@ -119,11 +118,23 @@ async def main():
     """主测试函数"""
     logger.info("🎯 开始 Playwright MCP Server 快速测试")
 
-    # 运行核心功能测试
-    core_test_passed = await test_core_functionality()
+    # 两项测试共用一个浏览器管理器，浏览器只启动一次
+    browser_manager = None
+    try:
+        browser_manager = create_browser_manager()
+        await browser_manager.warm_up(count=1)
+        logger.info("✅ BrowserManager 初始化成功")
+
+        # 运行核心功能测试
+        core_test_passed = await test_core_functionality(browser_manager)
 
-    # 运行错误处理测试
-    error_test_passed = await test_error_handling()
+        # 运行错误处理测试
+        error_test_passed = await test_error_handling(browser_manager)
+    finally:
+        # 预热失败时浏览器可能已经启动，同样需要清理
+        if browser_manager is not None:
+            await browser_manager.cleanup()
+            logger.info("✅ 资源清理完成")
 
     # 总结结果
     if core_test_passed and error_test_passed:
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+发布脚本测试
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# scripts/ 不是包，按文件路径加载发布脚本
+_spec = importlib.util.spec_from_file_location(
+    "release", Path(__file__).resolve().parent.parent / "scripts" / "release.py"
+)
+release = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(release)
+
+
+def test_replace_version():
+    """测试只替换第一处完全匹配的旧版本号"""
+    content = 'version = "0.1.1"\ntarget-version = ["py310"]\nversion = "0.1.1"\n'
+
+    assert release.replace_version(content, "version", "0.1.1", "0.2.0") == (
+        'version = "0.2.0"\ntarget-version = ["py310"]\nversion = "0.1.1"\n'
+    )
+
+
+def test_replace_init_version():
+    """测试更新 __init__.py 中的版本号"""
+    content = '__version__ = "0.1.1"\n__author__ = "ma-pony"\n'
+
+    assert release.replace_version(content, "__version__", "0.1.1", "0.1.2") == (
+        '__version__ = "0.1.2"\n__author__ = "ma-pony"\n'
+    )
+
+
+def test_replace_version_mismatch():
+    """测试文件中的版本号与当前版本不一致时报错"""
+    with pytest.raises(ValueError, match="版本号不一致"):
+        release.replace_version('__version__ = "0.1.0"\n', "__version__", "0.1.1", "0.1.2")
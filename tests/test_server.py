@@ -4,92 +4,132 @@ Playwright MCP Server 测试套件
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-import json
-from mcp_playwright.server import mcp, _browser, _page
+import orjson as json
+from fastmcp import Client
+from mcp_playwright.server import mcp
 
 
-class TestPlaywrightMCPServer:
-    """Playwright MCP服务器测试类"""
+async def call_tool(client: Client, name: str, arguments: dict = None) -> str:
+    """调用工具并返回文本结果"""
+    result = await client.call_tool(name, arguments or {})
+    return result.data
+
+
+@pytest_asyncio.fixture(scope="class")
+async def client():
+    """整个测试类共用一个客户端连接，服务器生命周期只执行一次"""
+    async with Client(mcp) as mcp_client:
+        yield mcp_client
+
+
+@pytest_asyncio.fixture(scope="class")
+async def browser_session(client):
+    """整个测试类只创建一次浏览器会话"""
+    await call_tool(client, "create_browser_session", {"headless": True})
+    yield
+    await call_tool(client, "close_browser_session")
+
+
+@pytest_asyncio.fixture
+async def blank_page(client, browser_session):
+    """每个测试开始前回到空白页，代替重新创建会话"""
+    await call_tool(client, "navigate_to_url", {"url": "about:blank"})
+
 
-    @pytest.mark.asyncio
-    async def test_launch_browser(self):
-        """测试启动浏览器功能"""
-        # 测试启动Chromium浏览器
-        result = await mcp.call_tool("launch_browser", {
+# 服务器模块持有全局浏览器状态，各测试类须在同一个 xdist worker 中运行
+@pytest.mark.xdist_group("browser_singleton")
+class TestBrowserLaunch:
+    """创建浏览器会话及没有会话时的测试"""
+
+    async def test_create_browser_session(self, client):
+        """测试创建浏览器会话功能"""
+        # 测试创建Chromium浏览器会话
+        result = await call_tool(client, "create_browser_session", {
             "browser_type": "chromium",
             "headless": True,
             "viewport_width": 1280,
             "viewport_height": 720
         })
 
-        assert "成功启动" in result
+        assert "成功创建浏览器会话" in result
         assert "chromium" in result
 
         # 清理
-        await mcp.call_tool("close_browser", {})
+        await call_tool(client, "close_browser_session")
 
-    @pytest.mark.asyncio
-    async def test_navigate_to_url(self):
-        """测试页面导航功能"""
-        # 首先启动浏览器
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
+    @pytest.mark.parametrize("uri, required", [
+        ("session://status", {"status", "session_id", "ready"}),
+        ("browser://health", {"initialized", "session_count", "max_sessions", "metrics", "status"}),
+    ])
+    async def test_resource(self, client, uri, required):
+        """测试会话状态资源和浏览器健康状态资源"""
+        contents = await client.read_resource(uri)
+        data = json.loads(contents[0].text)
+
+        assert required <= data.keys()
+
+    async def test_error_handling_without_session(self, client):
+        """测试没有浏览器会话时的错误处理"""
+        # 确保没有活动的会话
+        await call_tool(client, "close_browser_session")
+
+        # 尝试导航应该返回错误
+        result = await call_tool(client, "navigate_to_url", {
+            "url": "https://example.com"
+        })
+
+        assert "请先创建会话" in result
+
+        # 尝试点击元素应该返回错误
+        result = await call_tool(client, "click_element", {
+            "selector": "button"
         })
 
+        assert "请先创建会话" in result
+
+
+# 共用同一个浏览器会话，测试之间只回到空白页
+@pytest.mark.xdist_group("browser_singleton")
+@pytest.mark.usefixtures("blank_page")
+class TestPlaywrightMCPServer:
+    """Playwright MCP服务器测试类"""
+
+    async def test_navigate_to_url(self, client):
+        """测试页面导航功能"""
         # 导航到测试页面
-        result = await mcp.call_tool("navigate_to_url", {
+        result = await call_tool(client, "navigate_to_url", {
             "url": "https://example.com"
         })
 
         assert "成功导航到" in result
         assert "example.com" in result
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-    @pytest.mark.asyncio
-    async def test_get_page_info(self):
+    async def test_get_page_info(self, client):
         """测试获取页面信息功能"""
-        # 启动浏览器并导航
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
-        })
-
-        await mcp.call_tool("navigate_to_url", {
+        await call_tool(client, "navigate_to_url", {
             "url": "https://example.com"
         })
 
         # 获取页面标题
-        title = await mcp.call_tool("get_page_title", {})
+        title = await call_tool(client, "get_page_title")
         assert isinstance(title, str)
         assert len(title) > 0
 
         # 获取页面URL
-        url = await mcp.call_tool("get_page_url", {})
+        url = await call_tool(client, "get_page_url")
         assert "example.com" in url
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-    @pytest.mark.asyncio
-    async def test_execute_javascript(self):
+    async def test_execute_javascript(self, client):
         """测试JavaScript执行功能"""
-        # 启动浏览器并导航
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
-        })
-
-        await mcp.call_tool("navigate_to_url", {
+        await call_tool(client, "navigate_to_url", {
             "url": "https://example.com"
         })
 
         # 执行JavaScript
-        result = await mcp.call_tool("execute_javascript", {
-            "code": "return {title: document.title, url: window.location.href}"
+        result = await call_tool(client, "execute_javascript", {
+            "code": "() => ({title: document.title, url: window.location.href})"
         })
 
         # 解析结果
@@ -98,24 +138,14 @@ class TestPlaywrightMCPServer:
         assert "url" in data
         assert "example.com" in data["url"]
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-    @pytest.mark.asyncio
-    async def test_take_screenshot(self):
+    async def test_take_screenshot(self, client):
         """测试截图功能"""
-        # 启动浏览器并导航
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
-        })
-
-        await mcp.call_tool("navigate_to_url", {
+        await call_tool(client, "navigate_to_url", {
             "url": "https://example.com"
         })
 
         # 截图并保存到临时文件
-        result = await mcp.call_tool("take_screenshot", {
+        result = await call_tool(client, "take_screenshot", {
             "path": "/tmp/test_screenshot.png",
             "full_page": True
         })
@@ -123,58 +153,9 @@ class TestPlaywrightMCPServer:
         assert "截图已保存到" in result
         assert "/tmp/test_screenshot.png" in result
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-    def test_browser_status_resource(self):
-        """测试浏览器状态资源"""
-        status = mcp.get_resource("browser://status")
-        data = json.loads(status)
-
-        assert "playwright_launched" in data
-        assert "browser_launched" in data
-        assert "context_created" in data
-        assert "page_available" in data
-        assert "status" in data
-
-    def test_page_current_resource(self):
-        """测试当前页面资源"""
-        page_info = mcp.get_resource("page://current")
-        data = json.loads(page_info)
-
-        # 当浏览器未启动时应该返回错误信息
-        assert "error" in data or "url" in data
-
-    @pytest.mark.asyncio
-    async def test_error_handling_without_browser(self):
-        """测试未启动浏览器时的错误处理"""
-        # 确保浏览器未启动
-        await mcp.call_tool("close_browser", {})
-
-        # 尝试导航应该返回错误
-        result = await mcp.call_tool("navigate_to_url", {
-            "url": "https://example.com"
-        })
-
-        assert "错误：需要先启动浏览器" in result
-
-        # 尝试点击元素应该返回错误
-        result = await mcp.call_tool("click_element", {
-            "selector": "button"
-        })
-
-        assert "错误：需要先启动浏览器" in result
-
-    @pytest.mark.asyncio
-    async def test_element_operations(self):
+    async def test_element_operations(self, client):
         """测试元素操作功能"""
-        # 启动浏览器并导航到表单页面
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
-        })
-
-        await mcp.call_tool("navigate_to_url", {
+        await call_tool(client, "navigate_to_url", {
             "url": "https://httpbin.org/forms/post"
         })
 
@@ -182,7 +163,7 @@ class TestPlaywrightMCPServer:
         await asyncio.sleep(2)
 
         # 测试填写输入框
-        result = await mcp.call_tool("fill_input", {
+        result = await call_tool(client, "fill_input", {
             "selector": "input[name='custname']",
             "text": "测试用户"
         })
@@ -190,31 +171,21 @@ class TestPlaywrightMCPServer:
         assert "成功填写输入框" in result or "填写" in result
 
         # 测试获取文本内容
-        result = await mcp.call_tool("get_text_content", {
+        result = await call_tool(client, "get_text_content", {
             "selector": "h1"
         })
 
         # 应该能获取到页面标题
         assert isinstance(result, str)
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-    @pytest.mark.asyncio
-    async def test_wait_for_selector(self):
+    async def test_wait_for_selector(self, client):
         """测试等待元素功能"""
-        # 启动浏览器并导航
-        await mcp.call_tool("launch_browser", {
-            "browser_type": "chromium",
-            "headless": True
-        })
-
-        await mcp.call_tool("navigate_to_url", {
+        await call_tool(client, "navigate_to_url", {
             "url": "https://example.com"
         })
 
         # 等待body元素出现
-        result = await mcp.call_tool("wait_for_selector", {
+        result = await call_tool(client, "wait_for_selector", {
             "selector": "body",
             "timeout": 5000,
             "state": "visible"
@@ -222,10 +193,6 @@ class TestPlaywrightMCPServer:
 
         assert "元素已出现" in result or "body" in result
 
-        # 清理
-        await mcp.call_tool("close_browser", {})
-
-
 if __name__ == "__main__":
     """运行测试"""
     pytest.main([__file__, "-v"])
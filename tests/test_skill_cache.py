@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+技能缓存测试
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_playwright.skills.skill_cache import Skill, SkillCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """使用临时数据库的技能缓存"""
+    skill_cache = SkillCache(tmp_path / "skills.sqlite")
+    yield skill_cache
+    skill_cache.close()
+
+
+def make_skill(action_sig: str = "sig") -> Skill:
+    return Skill(
+        domain="fac.tumt.edu.tw",
+        action_sig=action_sig,
+        method="GET",
+        url="https://fac.tumt.edu.tw/personal/Teacher/qry/AbsPer.aspx",
+        headers={"accept": "text/html", "referer": "https://fac.tumt.edu.tw/"},
+        body=None,
+        status=200
+    )
+
+
+class FakeRequest:
+    """只提供 SkillCache.record 用到的属性"""
+
+    def __init__(self, method: str, headers: dict):
+        self.method = method
+        self.url = "https://fac.tumt.edu.tw/personal/Instructor/index.aspx"
+        self.headers = headers
+        self.post_data = None if method == "GET" else "Month=1&Day=1"
+
+    async def response(self):
+        return SimpleNamespace(status=200)
+
+
+def test_store_and_lookup(cache):
+    """测试保存后可以查到相同的技能"""
+    skill = make_skill()
+    cache.store(skill)
+
+    assert cache.lookup(skill.domain, skill.action_sig) == skill
+
+
+def test_lookup_missing(cache):
+    """测试未记录的技能返回 None"""
+    assert cache.lookup("fac.tumt.edu.tw", "missing") is None
+
+
+def test_invalidate(cache):
+    """测试失效后的技能不再返回"""
+    skill = make_skill()
+    cache.store(skill)
+    cache.invalidate(skill.domain, skill.action_sig)
+
+    assert cache.lookup(skill.domain, skill.action_sig) is None
+
+
+def test_signature_depends_on_account():
+    """测试不同帳號的相同动作使用不同的签名"""
+    args = ("get_student_leave_list", "table.table", "https://fac.tumt.edu.tw/")
+
+    assert SkillCache.signature(*args, "teacher1") != SkillCache.signature(*args, "teacher2")
+
+
+async def test_record_skips_post(cache):
+    """测试表单提交（POST）不会被记录为技能"""
+    request = FakeRequest("POST", {"accept": "text/html"})
+
+    assert await cache.record("fac.tumt.edu.tw", "sig", request) is None
+    assert cache.lookup("fac.tumt.edu.tw", "sig") is None
+
+
+async def test_record_keeps_only_allowed_headers(cache):
+    """测试只持久化允许的请求头，凭据不会写入磁盘"""
+    request = FakeRequest("GET", {
+        "accept": "text/html",
+        "authorization": "Bearer secret",
+        "cookie": "ASP.NET_SessionId=secret",
+        ":authority": "fac.tumt.edu.tw",
+    })
+
+    skill = await cache.record("fac.tumt.edu.tw", "sig", request)
+
+    assert skill.headers == {"accept": "text/html"}
+    assert cache.lookup("fac.tumt.edu.tw", "sig").headers == {"accept": "text/html"}